@@ -1,20 +1,31 @@
+import sys
+
+from . import scenarios
 from ._version import get_versions
-from .core import MAGICC6, MAGICC7  # noqa
+from .config import config as _config
+from .core import MAGICC6, MAGICC7, _get_magicc_class  # noqa
 from .io import MAGICCData  # noqa
-from .scenarios import (  # noqa
-    rcp26,
-    rcp45,
-    rcp60,
-    rcp85,
-    rcps,
-    read_scen_file,
-    zero_emissions,
-)
+from .parallel import MAGICCJob, iter_runs, run_ensemble  # noqa
+from .pool import get_pool
+from .scenarios import read_scen_file  # noqa
 
 __version__ = get_versions()["version"]
 del get_versions
 
 
+def __getattr__(name):
+    # the scenarios are only loaded when they are first used (see
+    # :mod:`pymagicc.scenarios`)
+    if name in scenarios._SCENARIO_LOADERS:
+        return getattr(scenarios, name)
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    from .scenarios import rcp26, rcp45, rcp60, rcp85, rcps, zero_emissions  # noqa
+
+
 def run(scenario, magicc_version=6, **kwargs):
     """
     Run a MAGICC scenario and return output data and (optionally) config parameters.
@@ -34,6 +45,12 @@ def run(scenario, magicc_version=6, **kwargs):
     **kwargs
         Parameters overwriting default parameters
 
+    Notes
+    -----
+    If the ``POOL_SIZE`` config value (see :mod:`pymagicc.config`) is greater than
+    zero, the run uses a copy of MAGICC from a pool of ready-to-use copies (see
+    :mod:`pymagicc.pool`) instead of creating a new copy for every run.
+
     Raises
     ------
     ValueError
@@ -45,12 +62,11 @@ def run(scenario, magicc_version=6, **kwargs):
         Output of the run with the data in the ``df`` attribute and parameters and
         other metadata in the ``metadata attribute``
     """
-    if magicc_version == 6:
-        magicc_cls = MAGICC6
-    elif magicc_version == 7:
-        magicc_cls = MAGICC7
-    else:
-        raise ValueError("MAGICC version {} is not available".format(magicc_version))
+    magicc_cls = _get_magicc_class(magicc_version)
+
+    if int(_config["pool_size"]) > 0:
+        with get_pool(magicc_version).magicc() as magicc:
+            return magicc.run(scenario=scenario, **kwargs)
 
     with magicc_cls() as magicc:
         results = magicc.run(scenario=scenario, **kwargs)
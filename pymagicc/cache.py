@@ -0,0 +1,203 @@
+"""
+An on-disk cache of MAGICC results.
+
+Running the same scenario with the same configuration always gives the same result.
+If the ``CACHE_DIR`` config value (see :mod:`pymagicc.config`) is set,
+:meth:`pymagicc.core.MAGICCBase.run` stores each run's output in this directory and
+returns the stored output, without running MAGICC, if an identical run is requested
+again.
+
+Results are keyed by a hash of the MAGICC executable, the configuration written by
+Pymagicc (``MAGTUNE_PYMAGICC.CFG``, ``MAGCFG_NMLYEARS.CFG`` and ``MAGCFG_USER.CFG``),
+the scenario file and the variables requested with ``only``. Other input files in the
+run directory are not included so the cache should be cleared (see
+:meth:`ResultCache.clear`) if these are altered.
+
+The cache is bounded by the ``CACHE_MAX_SIZE`` config value (in bytes). Once the cache
+is larger than this, the least recently used results are removed.
+"""
+import functools
+import hashlib
+import os
+import pickle  # nosec # we only load files we have written ourselves
+from os import listdir, makedirs, remove, replace, stat, utime
+from os.path import exists, join
+from tempfile import mkstemp
+
+from .config import config
+
+_CACHE_EXT = ".pkl"
+
+
+@functools.lru_cache()
+def _hash_file_contents(filepath, size, mtime_ns):
+    # ``size`` and ``mtime_ns`` are only used to invalidate the lru cache
+    hasher = hashlib.sha256()
+    with open(filepath, "rb") as fh:
+        for chunk in iter(functools.partial(fh.read, 1024 ** 2), b""):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+def hash_file(filepath):
+    """
+    Get a hash of a file's contents
+
+    Hashes are cached in memory until the file's size or modification time changes,
+    hence repeatedly hashing large files (e.g. the MAGICC executable) is cheap.
+
+    Parameters
+    ----------
+    filepath : str
+        File to hash
+
+    Returns
+    -------
+    str
+        Hash of the file's contents
+    """
+    file_stat = stat(filepath)
+
+    return _hash_file_contents(filepath, file_stat.st_size, file_stat.st_mtime_ns)
+
+
+class ResultCache:
+    """
+    Size-bounded on-disk cache of MAGICC results
+
+    Each result is pickled into its own file, named by its key. Whenever a result is
+    read, its modification time is updated so that we can evict the least recently
+    used results first.
+    """
+
+    def __init__(self, cache_dir, max_size=None):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        cache_dir : str
+            Directory in which to store results. It is created if it does not exist.
+
+        max_size : int
+            Maximum size of the cache (bytes). If ``None``, the ``CACHE_MAX_SIZE``
+            config value is used.
+        """
+        if max_size is None:
+            max_size = int(config["cache_max_size"])
+
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def _get_filepath(self, key):
+        return join(self.cache_dir, key + _CACHE_EXT)
+
+    def get(self, key):
+        """
+        Get a result from the cache
+
+        Parameters
+        ----------
+        key : str
+            Key of the result
+
+        Returns
+        -------
+        :obj:`pymagicc.io.MAGICCData`
+            The cached result. ``None`` if there is no result for ``key``.
+        """
+        filepath = self._get_filepath(key)
+        try:
+            with open(filepath, "rb") as fh:
+                result = pickle.load(fh)  # nosec # see import
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        try:
+            utime(filepath)
+        except FileNotFoundError:  # pragma: no cover # evicted by another process
+            pass
+
+        return result
+
+    def set(self, key, result):
+        """
+        Store a result in the cache
+
+        Once the result is stored, the least recently used results are removed until
+        the cache is no larger than ``self.max_size``.
+
+        Parameters
+        ----------
+        key : str
+            Key of the result
+
+        result : :obj:`pymagicc.io.MAGICCData`
+            Result to store
+        """
+        makedirs(self.cache_dir, exist_ok=True)
+
+        # write to a temporary file first so that other processes never read a
+        # partially written result
+        fd, tmp_filepath = mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+        replace(tmp_filepath, self._get_filepath(key))
+
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for filename in listdir(self.cache_dir):
+            if not filename.endswith(_CACHE_EXT):
+                continue
+
+            filepath = join(self.cache_dir, filename)
+            try:
+                file_stat = stat(filepath)
+            except FileNotFoundError:  # pragma: no cover # removed by another process
+                continue
+
+            entries.append((file_stat.st_mtime_ns, file_stat.st_size, filepath))
+
+        total_size = sum([e[1] for e in entries])
+        for _, size, filepath in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            try:
+                remove(filepath)
+            except FileNotFoundError:  # pragma: no cover # removed by another process
+                pass
+
+            total_size -= size
+
+    def clear(self):
+        """
+        Remove all results from the cache
+        """
+        if not exists(self.cache_dir):
+            return
+
+        for filename in listdir(self.cache_dir):
+            if filename.endswith(_CACHE_EXT):
+                remove(join(self.cache_dir, filename))
+
+
+def get_result_cache():
+    """
+    Get the result cache defined by the ``CACHE_DIR`` config value
+
+    Returns
+    -------
+    :obj:`ResultCache`
+        The result cache. ``None`` if ``CACHE_DIR`` is not set i.e. caching is
+        disabled.
+    """
+    cache_dir = config["cache_dir"]
+    if not cache_dir:
+        return None
+
+    return ResultCache(cache_dir)
@@ -7,8 +7,9 @@ Overrides > Environment variable > Defaults
 Overrides can be set using the :class:`ConfigStore`
 """
 
+import functools
 import platform
-import subprocess  # nosec # have to use subprocess
+import shutil
 from os import environ
 from os.path import abspath, dirname, join
 
@@ -19,13 +20,29 @@ _is_windows = platform.system() == "Windows"
 default_config = {
     "EXECUTABLE_6": join(dirname(abspath(__file__)), "MAGICC6/run/magicc6.exe"),
     "IS_WINDOWS": _is_windows,
+    "POOL_SIZE": 0,
+    "COPY_STRATEGY": "copy",
+    "TMPDIR": None,
+    "CACHE_DIR": None,
+    "CACHE_MAX_SIZE": 1024 ** 3,
 }
-_wine_installed = (
-    subprocess.call(  # nosec # require subprocess call here
-        "type wine", shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-    )
-    == 0
-)
+
+
+@functools.lru_cache()
+def _wine_installed():
+    """
+    Check whether wine is installed
+
+    Wine is only needed to run ``.exe`` binaries on non-Windows platforms so we only
+    check for it when such a binary is run. The result is cached so the search is only
+    done once per process.
+
+    Returns
+    -------
+    bool
+        True if a ``wine`` executable is on the ``PATH``
+    """
+    return shutil.which("wine") is not None
 
 
 def lookup_defaults(item):
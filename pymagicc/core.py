@@ -1,10 +1,19 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import os
 import shutil
+import signal
 import subprocess  # nosec # have to use subprocess
+import time
 import warnings
 from collections import Counter
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
-from os import listdir, makedirs
-from os.path import abspath, basename, dirname, exists, isfile, join
+from os import W_OK, access, link, listdir, makedirs, remove, stat, walk
+from os.path import abspath, basename, dirname, exists, getsize, isdir, isfile, join
 from subprocess import PIPE  # nosec # have to use subprocess
 from tempfile import mkdtemp
 
@@ -15,28 +24,98 @@ from dateutil.relativedelta import relativedelta
 from openscm_units import unit_registry
 from scmdata import run_append
 
+from . import definitions, scenarios
+from .cache import get_result_cache, hash_file
 from .config import _wine_installed, config
+from .definitions import convert_magicc7_to_openscm_variables
 from .errors import InvalidTemporalResError, NoReaderWriterError
 from .io import MAGICCData, read_cfg_file
 from .io.utils import _get_openscm_var_from_filepath
-from .scenarios import zero_emissions
 from .utils import get_date_time_string
 
 IS_WINDOWS = config["is_windows"]
 
+_logger = logging.getLogger(__name__)
+
 
 class WineNotInstalledError(Exception):
     """Exception raised if wine is not installed but is required"""
 
 
-def _copy_files(source, target, recursive=False):
+_FICLONE = 0x40049409
+"""int: ``ioctl`` request code used to reflink a file on Linux"""
+
+COPY_STRATEGIES = ["copy", "hardlink", "reflink"]
+"""list: Valid strategies for copying the MAGICC distribution"""
+
+_TMP_DIR_HEADROOM = 100 * 1024 ** 2
+"""int: Free space (bytes) to leave for MAGICC's output when copying to ``tmp_dir``"""
+
+
+def _reflink_file(source, target):
+    import fcntl  # only available on unix-like systems
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+    shutil.copymode(source, target)
+
+
+def _copy_file(source, target, strategy="copy"):
+    """
+    Copy a single file using ``strategy``
+
+    If the file cannot be linked (e.g. because ``source`` and ``target`` are on
+    different filesystems or the filesystem does not support reflinks), we fall back
+    to copying it.
+    """
+    if isdir(target):
+        target = join(target, basename(source))
+
+    if strategy == "hardlink":
+        try:
+            link(source, target)
+            return target
+        except OSError:
+            pass
+
+    elif strategy == "reflink":
+        try:
+            _reflink_file(source, target)
+            return target
+        except (ImportError, OSError):
+            if exists(target):
+                remove(target)
+
+    return shutil.copy(source, target)
+
+
+def _unlink_if_shared(filepath):
+    """
+    Remove a hardlinked file so that writing to it doesn't alter any other links
+    """
+    if exists(filepath) and stat(filepath).st_nlink > 1:
+        remove(filepath)
+
+
+def _copy_files(source, target, recursive=False, strategy="copy", copy_only=()):
     """
     Copy all the files in source directory to target.
 
     If ``recursive``, include subdirectories, otherwise ignores subdirectories.
+
+    ``strategy`` determines how files are copied (see :func:`_copy_file`). Files whose
+    names are in ``copy_only`` are always copied.
     """
+
+    def _copy_function(src, dst):
+        if basename(src) in copy_only:
+            return _copy_file(src, dst)
+
+        return _copy_file(src, dst, strategy=strategy)
+
     if recursive:
-        shutil.copytree(source, target)
+        shutil.copytree(source, target, copy_function=_copy_function)
 
         return
 
@@ -48,7 +127,83 @@ def _copy_files(source, target, recursive=False):
     for filename in source_files:
         full_filename = join(source, filename)
         if isfile(full_filename):
-            shutil.copy(full_filename, target)
+            _copy_function(full_filename, target)
+
+
+@functools.lru_cache()
+def _get_dir_size(directory, recursive=False):
+    """
+    Get the total size (in bytes) of the files in ``directory``
+
+    If ``recursive``, include files in subdirectories.
+    """
+    if not isdir(directory):
+        return 0
+
+    if recursive:
+        return sum(
+            [
+                stat(join(dirpath, filename)).st_size
+                for dirpath, _, filenames in walk(directory)
+                for filename in filenames
+            ]
+        )
+
+    return sum(
+        [
+            stat(join(directory, filename)).st_size
+            for filename in listdir(directory)
+            if isfile(join(directory, filename))
+        ]
+    )
+
+
+def _empty_run_output():
+    return MAGICCData(
+        data={},
+        columns={"model": [], "unit": [], "variable": [], "region": [], "scenario": []},
+    )
+
+
+def _kill_process_tree(proc):
+    """
+    Kill a process and all the processes it started (e.g. ``wine`` and MAGICC)
+
+    On Windows, ``taskkill`` is used. Elsewhere, the process must have been started
+    in a new session so that it leads its own process group.
+    """
+    if proc.returncode is not None:
+        return
+
+    if IS_WINDOWS:  # pragma: no cover
+        subprocess.run(  # nosec # only ever called with a process id
+            ["taskkill", "/F", "/T", "/PID", str(proc.pid)], stdout=PIPE, stderr=PIPE
+        )
+        return
+
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:  # pragma: no cover # process has just exited
+        pass
+
+
+def _read_output_file(filepath, columns):
+    """
+    Read a MAGICC output file
+
+    This is a module level function so that it can be used with any executor.
+
+    Returns
+    -------
+    :obj:`pymagicc.io.MAGICCData`
+        Data in the file. ``None`` if the file cannot be read into a
+        :obj:`pymagicc.io.MAGICCData`.
+    """
+    try:
+        return MAGICCData(filepath, columns=deepcopy(columns))
+    except (NoReaderWriterError, InvalidTemporalResError):
+        # TODO: something like warnings.warn("Could not read {}".format(filepath))
+        return None
 
 
 def _clean_value(v):
@@ -60,6 +215,22 @@ def _clean_value(v):
     return v
 
 
+def _hash_scenario(scenario):
+    """
+    Get a hash of a scenario's data and metadata
+
+    Two scenarios with the same hash result in the same scenario file being written.
+    """
+    timeseries = scenario.timeseries()
+    hasher = hashlib.sha256()
+    hasher.update(pd.util.hash_pandas_object(timeseries, index=True).values.tobytes())
+    hasher.update(repr(timeseries.index.names).encode())
+    hasher.update(repr(timeseries.columns.tolist()).encode())
+    hasher.update(repr(sorted(scenario.metadata.items())).encode())
+
+    return hasher.hexdigest()
+
+
 class MAGICCBase(object):
     """
     Provides access to the MAGICC binary and configuration.
@@ -87,7 +258,10 @@ class MAGICCBase(object):
     version = None
     _scen_file_name = "SCENARIO.SCEN7"
 
-    def __init__(self, root_dir=None, strict=True):
+    _output_flags = []
+    """list: (variable suffix, ``out_xx`` flag which writes the variable) pairs"""
+
+    def __init__(self, root_dir=None, strict=True, copy_strategy=None, tmp_dir=None):
         """
         Initialise
 
@@ -102,12 +276,58 @@ class MAGICCBase(object):
             is raised if any invalid configuration is found and the run is
             continued. Setting ``strict=False`` is only recommended for
             experienced users of MAGICC.
+        copy_strategy : {"copy", "hardlink", "reflink"}
+            How to copy the MAGICC distribution in ``create_copy``. "hardlink" and
+            "reflink" link MAGICC's binary and input files rather than copying them,
+            which makes creating copies almost free. Files which Pymagicc writes are
+            always copied and any hardlinked file is unlinked before it is written
+            by this instance's methods (e.g. ``write`` and ``set_config``). Hence, if
+            using "hardlink", files in the run directory must not be written to
+            directly as this would also alter the original MAGICC distribution. If
+            linking fails (e.g. because the copy is on a different filesystem),
+            files are copied instead. If ``None``, the ``COPY_STRATEGY`` config
+            value is used.
+        tmp_dir : str
+            Directory in which ``create_copy`` creates temporary copies of MAGICC.
+            Placing copies on a RAM-backed filesystem (e.g. ``/dev/shm``) means
+            MAGICC's output never touches the disk. If the directory does not
+            exist, is not writeable or does not have enough free space for a copy of
+            MAGICC plus its output, a warning is raised and the system's default
+            temporary directory is used instead. If ``None``, the ``TMPDIR`` config
+            value is used. If that is also ``None``, the system's default temporary
+            directory is used.
+
+        Raises
+        ------
+        ValueError
+            An invalid value for ``copy_strategy`` is supplied
         """
         self.root_dir = root_dir
         self.config = None
+        # hash and file stamp of the last scenario written by
+        # ``set_emission_scenario_setup``
+        self._written_scenario = None
+        # namelists read or set by this instance, keyed by full filepath, see
+        # ``_read_namelist``
+        self._namelists = {}
+        self._defer_namelist_writes = False
+        # timings of the current run, see ``_timed``
+        self._timings = None
         self.executable = self.get_executable()
         self.strict = strict
 
+        if copy_strategy is None:
+            copy_strategy = config["copy_strategy"]
+        if copy_strategy not in COPY_STRATEGIES:
+            raise ValueError(
+                "`copy_strategy` must be one of: {}".format(COPY_STRATEGIES)
+            )
+        self.copy_strategy = copy_strategy
+
+        if tmp_dir is None:
+            tmp_dir = config["tmpdir"]
+        self.tmp_dir = tmp_dir
+
         if root_dir is not None:
             self.is_temp = False
         else:
@@ -128,7 +348,8 @@ class MAGICCBase(object):
         configuration files and binary.
 
         The root folder and ``bin`` folders are copied (not recursively). The
-        ``run`` folder is copied recursively.
+        ``run`` folder is copied recursively. How files are copied is controlled by
+        ``self.copy_strategy``.
         """
         if self.executable is None or not isfile(self.executable):
             raise FileNotFoundError(
@@ -142,7 +363,7 @@ class MAGICCBase(object):
                     "A temp copy for this instance has already been created"
                 )
 
-            self.root_dir = mkdtemp(prefix="pymagicc-")
+            self.root_dir = mkdtemp(prefix="pymagicc-", dir=self._get_tmp_dir())
 
         if exists(self.run_dir):
             raise Exception("A copy of MAGICC has already been created.")
@@ -169,6 +390,8 @@ class MAGICCBase(object):
                     source_dir,
                     join(self.root_dir, d),
                     recursive=d in dirs_to_copy_recursive,
+                    strategy=self.copy_strategy,
+                    copy_only=self._written_files,
                 )
 
         # Create an empty out dir
@@ -179,6 +402,57 @@ class MAGICCBase(object):
         self.set_years()
         self.set_config()
 
+    def _get_tmp_dir(self):
+        """
+        Get the directory in which to create a temporary copy of MAGICC
+
+        Returns
+        -------
+        str
+            ``self.tmp_dir`` if it is usable, otherwise ``None`` i.e. use the system's
+            default temporary directory
+        """
+        if self.tmp_dir is None:
+            return None
+
+        if not isdir(self.tmp_dir) or not access(self.tmp_dir, W_OK):
+            warnings.warn(
+                "Cannot write to {}, using the default temporary directory "
+                "instead".format(self.tmp_dir)
+            )
+            return None
+
+        root = abspath(join(self.original_dir, ".."))
+        required_space = (
+            _get_dir_size(root)
+            + _get_dir_size(join(root, "bin"))
+            + _get_dir_size(join(root, "run"), recursive=True)
+            + _TMP_DIR_HEADROOM
+        )
+        free_space = shutil.disk_usage(self.tmp_dir).free
+        if free_space < required_space:
+            warnings.warn(
+                "Not enough free space in {} ({} MB required, {} MB available), "
+                "using the default temporary directory instead".format(
+                    self.tmp_dir, required_space // 1024 ** 2, free_space // 1024 ** 2
+                )
+            )
+            return None
+
+        return self.tmp_dir
+
+    @property
+    def _written_files(self):
+        """
+        Files in the run directory which Pymagicc writes as part of normal usage
+        """
+        return [
+            "MAGTUNE_PYMAGICC.CFG",
+            "MAGCFG_NMLYEARS.CFG",
+            "MAGCFG_USER.CFG",
+            self._scen_file_name,
+        ]
+
     @property
     def binary_name(self):
         """
@@ -262,7 +536,16 @@ class MAGICCBase(object):
 
         return self._default_config
 
-    def run(self, scenario=None, only=None, debug=False, **kwargs):
+    def run(
+        self,
+        scenario=None,
+        only=None,
+        debug=False,
+        parse_workers=1,
+        timeout=None,
+        subannual=False,
+        **kwargs,
+    ):
         """
         Run MAGICC and parse the output.
 
@@ -274,8 +557,149 @@ class MAGICCBase(object):
         For MAGICC7 and above, The level of logging can be controlled with the
         ``debug`` argument.
 
-        Any subannual files output by MAGICC will be ignored by this function. These
-        files can be read in manually using :class:`pymagicc.io.MAGICCData` directly.
+        The time (in seconds) spent in each phase of the run (e.g. ``"magicc"`` or
+        ``"read_output"``), the number of output files read and their total size (in
+        bytes) are in ``output.metadata["timings"]``. They are also logged to the
+        ``pymagicc.core`` logger at debug level.
+
+        Any subannual files output by MAGICC are ignored unless ``subannual`` is
+        True. These files can also be read in manually using
+        :class:`pymagicc.io.MAGICCData` directly.
+
+        Parameters
+        ----------
+        scenario : :obj:`pymagicc.io.MAGICCData`
+            Scenario to run. If None MAGICC will simply run with whatever config has
+            already been set.
+
+        only : list of str
+            If not None, only extract variables in this list. If all the variables
+            can be mapped to MAGICC's output flags, MAGICC is also configured to only
+            write these variables for this run (unless the relevant ``out_xx`` flags
+            are supplied in ``kwargs``). The previous output configuration is restored
+            after the run.
+
+        debug: {True, False, "verbose"}
+            If true, MAGICC will run in debug mode with the maximum amount of logging.
+            If "verbose", MAGICC will be run in verbose mode.
+
+        parse_workers : int or :obj:`concurrent.futures.Executor`
+            If an integer greater than one, MAGICC's output files are read in
+            parallel using a pool of this many threads. Alternately, an executor
+            (e.g. a :obj:`concurrent.futures.ProcessPoolExecutor`) to read the files
+            with. The output is the same, whichever way it is read.
+
+        timeout : float
+            If not ``None``, the maximum time (in seconds) for which MAGICC may run.
+            If MAGICC runs for longer, it and any processes it started are killed, the
+            output directory is cleared (so the instance can be used for the next
+            run) and a :class:`subprocess.TimeoutExpired` is raised.
+
+        subannual : bool
+            If True, also read any subannual (i.e. monthly) output files which MAGICC
+            writes (see the ``out_forcing_subannual`` and ``out_temperature_subannual``
+            flags). These timeseries are on a different time axis from the annual
+            output so they are returned separately, in
+            ``output.metadata["subannual"]``, as a :obj:`pymagicc.io.MAGICCData`.
+
+        kwargs
+            Other config values to pass to MAGICC for the run
+
+        Returns
+        -------
+        :obj:`pymagicc.io.MAGICCData`
+            MAGICCData object containing that data in its ``df`` attribute and
+            metadata and parameters (depending on the value of ``include_parameters``)
+            in its ``metadata`` attribute.
+
+        Raises
+        ------
+        ValueError
+            If no output is found which matches the list specified in ``only``.
+
+        subprocess.CalledProcessError
+            If MAGICC fails to run. Check the 'stderr' key of the result's `metadata`
+            attribute to inspect the results output from MAGICC.
+
+        subprocess.TimeoutExpired
+            MAGICC runs for longer than ``timeout``
+
+        ValueError
+            The user attempts to use ``debug`` with MAGICC6
+        """
+        start = self._start_timings()
+        try:
+            cache = get_result_cache()
+            with self._limited_output(only, kwargs):
+                command = self._prepare_run(scenario, debug, kwargs)
+                if cache is not None:
+                    with self._timed("cache"):
+                        cache_key = self._get_cache_key(only, subannual)
+                        cached = cache.get(cache_key)
+                    if cached is not None:
+                        mdata = self._use_cached_result(cached)
+                        return self._finish_timings(mdata, start)
+
+                with self._timed("magicc"):
+                    stderr = self._run_magicc(command, timeout)
+
+            mdata = self._read_run_output(
+                scenario, only, stderr, parse_workers, subannual
+            )
+            if cache is not None:
+                with self._timed("cache"):
+                    cache.set(cache_key, mdata)
+
+            return self._finish_timings(mdata, start)
+        finally:
+            # don't leave the timings of a failed run behind
+            self._timings = None
+
+    def _run_magicc(self, command, timeout):
+        # thank you https://stackoverflow.com/a/53209196 for Python 3.6 hack
+        proc = subprocess.Popen(  # nosec # on Windows shell=True is required
+            command,
+            stdout=PIPE,
+            stderr=PIPE,
+            cwd=self.run_dir,
+            shell=IS_WINDOWS,
+            # so that we can kill MAGICC and any processes it starts
+            start_new_session=not IS_WINDOWS,
+        )
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._kill_run(proc)
+            raise
+        except BaseException:
+            _kill_process_tree(proc)
+            raise
+
+        if proc.returncode:
+            print("stderr:\n{}".format(stderr.decode()))
+            raise subprocess.CalledProcessError(
+                proc.returncode, command, output=stdout, stderr=stderr
+            )
+
+        return stderr
+
+    async def arun(
+        self,
+        scenario=None,
+        only=None,
+        debug=False,
+        parse_workers=1,
+        timeout=None,
+        subannual=False,
+        **kwargs,
+    ):
+        """
+        Run MAGICC and parse the output without blocking the event loop.
+
+        This is the ``asyncio`` counterpart of :meth:`run`. MAGICC is started with
+        :func:`asyncio.create_subprocess_exec` and the output is parsed in the event
+        loop's default executor. As a result, a single event loop can keep many
+        MAGICC instances busy at once.
 
         Parameters
         ----------
@@ -284,12 +708,35 @@ class MAGICCBase(object):
             already been set.
 
         only : list of str
-            If not None, only extract variables in this list.
+            If not None, only extract variables in this list. If all the variables
+            can be mapped to MAGICC's output flags, MAGICC is also configured to only
+            write these variables for this run (unless the relevant ``out_xx`` flags
+            are supplied in ``kwargs``). The previous output configuration is restored
+            after the run.
 
         debug: {True, False, "verbose"}
             If true, MAGICC will run in debug mode with the maximum amount of logging.
             If "verbose", MAGICC will be run in verbose mode.
 
+        parse_workers : int or :obj:`concurrent.futures.Executor`
+            If an integer greater than one, MAGICC's output files are read in
+            parallel using a pool of this many threads. Alternately, an executor
+            (e.g. a :obj:`concurrent.futures.ProcessPoolExecutor`) to read the files
+            with. The output is the same, whichever way it is read.
+
+        timeout : float
+            If not ``None``, the maximum time (in seconds) for which MAGICC may run.
+            If MAGICC runs for longer, it and any processes it started are killed, the
+            output directory is cleared (so the instance can be used for the next
+            run) and a :class:`subprocess.TimeoutExpired` is raised.
+
+        subannual : bool
+            If True, also read any subannual (i.e. monthly) output files which MAGICC
+            writes (see the ``out_forcing_subannual`` and ``out_temperature_subannual``
+            flags). These timeseries are on a different time axis from the annual
+            output so they are returned separately, in
+            ``output.metadata["subannual"]``, as a :obj:`pymagicc.io.MAGICCData`.
+
         kwargs
             Other config values to pass to MAGICC for the run
 
@@ -309,9 +756,184 @@ class MAGICCBase(object):
             If MAGICC fails to run. Check the 'stderr' key of the result's `metadata`
             attribute to inspect the results output from MAGICC.
 
+        subprocess.TimeoutExpired
+            MAGICC runs for longer than ``timeout``
+
         ValueError
             The user attempts to use ``debug`` with MAGICC6
         """
+        start = self._start_timings()
+        try:
+            cache = get_result_cache()
+            with self._limited_output(only, kwargs):
+                command = self._prepare_run(scenario, debug, kwargs)
+                if cache is not None:
+                    with self._timed("cache"):
+                        cache_key = self._get_cache_key(only, subannual)
+                        cached = cache.get(cache_key)
+                    if cached is not None:
+                        mdata = self._use_cached_result(cached)
+                        return self._finish_timings(mdata, start)
+
+                with self._timed("magicc"):
+                    stderr = await self._arun_magicc(command, timeout)
+
+            loop = asyncio.get_running_loop()
+            mdata = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    self._read_run_output,
+                    scenario,
+                    only,
+                    stderr,
+                    parse_workers,
+                    subannual,
+                ),
+            )
+            if cache is not None:
+                with self._timed("cache"):
+                    cache.set(cache_key, mdata)
+
+            return self._finish_timings(mdata, start)
+        finally:
+            # don't leave the timings of a failed run behind
+            self._timings = None
+
+    async def _arun_magicc(self, command, timeout):
+        proc = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=PIPE,
+            stderr=PIPE,
+            cwd=self.run_dir,
+            start_new_session=not IS_WINDOWS,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            self._kill_run(proc)
+            await proc.wait()
+            raise subprocess.TimeoutExpired(command, timeout)
+        except BaseException:
+            _kill_process_tree(proc)
+            raise
+
+        if proc.returncode:
+            print("stderr:\n{}".format(stderr.decode()))
+            raise subprocess.CalledProcessError(
+                proc.returncode, command, output=stdout, stderr=stderr
+            )
+
+        return stderr
+
+    def _start_timings(self):
+        self._timings = {}
+
+        return time.perf_counter()
+
+    def _finish_timings(self, mdata, start):
+        """
+        Attach the timings of the current run to its output
+
+        The timings are also logged at debug level.
+        """
+        timings = self._timings
+        self._timings = None
+        timings["total"] = time.perf_counter() - start
+
+        mdata.metadata["timings"] = timings
+        _logger.debug("MAGICC%s run timings: %s", self.version, timings)
+
+        return mdata
+
+    @contextmanager
+    def _timed(self, phase):
+        """
+        Context manager which adds the time spent within it to ``phase``
+
+        Nothing is recorded unless a run is in progress.
+        """
+        if self._timings is None:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._timings[phase] = (
+                self._timings.get(phase, 0) + time.perf_counter() - start
+            )
+
+    def _get_cache_key(self, only, subannual=False):
+        """
+        Get the key of the current run in the result cache
+
+        The key is a hash of the executable, Pymagicc's configuration files, the
+        scenario file, ``only`` and ``subannual``. It must be calculated after the
+        run's configuration has been set.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(hash_file(self.executable).encode())
+        for filename in [
+            "MAGTUNE_PYMAGICC.CFG",
+            "MAGCFG_NMLYEARS.CFG",
+            "MAGCFG_USER.CFG",
+        ]:
+            namelist = self._read_namelist(filename)
+            for group in sorted(namelist):
+                values = namelist[group]
+                if isinstance(values, dict):
+                    # the order of the flags and the rundate don't affect the output
+                    values = sorted(
+                        [(k, v) for k, v in values.items() if k != "rundate"]
+                    )
+
+                hasher.update(repr((filename, group, values)).encode())
+
+        scen_file = join(self.run_dir, self._scen_file_name)
+        if exists(scen_file):
+            hasher.update(hash_file(scen_file).encode())
+
+        hasher.update(repr(None if only is None else sorted(only)).encode())
+        if subannual:
+            hasher.update(b"subannual")
+
+        return hasher.hexdigest()
+
+    def _use_cached_result(self, mdata):
+        if "parameters" in mdata.metadata:
+            self.config = mdata.metadata["parameters"]
+
+        return mdata
+
+    def _kill_run(self, proc):
+        """
+        Kill a MAGICC run which has timed out
+
+        The output directory is cleared so that a subsequent run can't pick up
+        partial output.
+        """
+        _kill_process_tree(proc)
+        if isinstance(proc, subprocess.Popen):
+            proc.communicate()
+
+        self._clear_out_dir()
+
+    def _clear_out_dir(self):
+        for filename in listdir(self.out_dir):
+            full_filename = join(self.out_dir, filename)
+            if isfile(full_filename):
+                remove(full_filename)
+
+    def _prepare_run(self, scenario, debug, kwargs):
+        """
+        Write the scenario and config for a run
+
+        Returns
+        -------
+        list of str
+            Command with which to start MAGICC
+        """
         if not exists(self.root_dir):
             raise FileNotFoundError(self.root_dir)
 
@@ -322,24 +944,29 @@ class MAGICCBase(object):
                 )
             )
 
-        if scenario is not None:
-            kwargs = self.set_emission_scenario_setup(scenario, kwargs)
+        # configuration is only held in memory until it has all been set so that
+        # each configuration file is written at most once
+        with self._deferred_namelist_writes():
+            if scenario is not None:
+                with self._timed("write_scenario"):
+                    kwargs = self.set_emission_scenario_setup(scenario, kwargs)
 
-        yr_config = {}
-        if "startyear" in kwargs:
-            yr_config["startyear"] = kwargs.pop("startyear")
-        if "endyear" in kwargs:
-            yr_config["endyear"] = kwargs.pop("endyear")
-        if yr_config:
-            self.set_years(**yr_config)
+            with self._timed("set_config"):
+                yr_config = {}
+                if "startyear" in kwargs:
+                    yr_config["startyear"] = kwargs.pop("startyear")
+                if "endyear" in kwargs:
+                    yr_config["endyear"] = kwargs.pop("endyear")
+                if yr_config:
+                    self.set_years(**yr_config)
 
-        # should be able to do some other nice metadata stuff re how magicc was run
-        # etc. here
-        kwargs.setdefault("rundate", get_date_time_string())
+                # should be able to do some other nice metadata stuff re how magicc
+                # was run etc. here
+                kwargs.setdefault("rundate", get_date_time_string())
 
-        self.update_config(**kwargs)
+                self.update_config(**kwargs)
 
-        self.check_config()
+                self.check_config()
 
         exec_dir = basename(self.original_dir)
         command = [join(self.root_dir, exec_dir, self.binary_name)]
@@ -352,26 +979,25 @@ class MAGICCBase(object):
             raise ValueError("MAGICC6 has no debug capability")
 
         if not IS_WINDOWS and self.binary_name.endswith(".exe"):  # pragma: no cover
-            if not _wine_installed:
+            if not _wine_installed():
                 raise WineNotInstalledError(
                     "Wine is not installed but is required to run `.exe` binaries"
                 )
             command.insert(0, "wine")
 
-        try:
-            res = subprocess.run(  # nosec # on Windows shell=True is required
-                command,
-                check=True,
-                # thank you https://stackoverflow.com/a/53209196 for Python 3.6 hack
-                stdout=PIPE,
-                stderr=PIPE,
-                cwd=self.run_dir,
-                shell=IS_WINDOWS,
-            )
-        except subprocess.CalledProcessError as exc:
-            print("stderr:\n{}".format(exc.stderr.decode()))
-            raise exc
+        return command
 
+    def _read_run_output(
+        self, scenario, only, stderr, parse_workers=1, subannual=False
+    ):
+        """
+        Read the output of a run
+
+        Returns
+        -------
+        :obj:`pymagicc.io.MAGICCData`
+            Output of the run
+        """
         outfiles = self._get_output_filenames()
         read_cols = {"climate_model": ["MAGICC{}".format(self.version)]}
         if scenario is not None:
@@ -381,46 +1007,71 @@ class MAGICCBase(object):
             read_cols.setdefault("model", ["unspecified"])
             read_cols.setdefault("scenario", ["unspecified"])
 
-        mdata = []
+        to_read = []
+        to_read_subannual = []
         for filepath in outfiles:
-            if filepath.startswith("DAT_VOLCANIC_RF.") or "SUBANN" in filepath:
+            is_subannual = filepath.startswith("DAT_VOLCANIC_RF.") or (
+                "SUBANN" in filepath
+            )
+            if is_subannual and not subannual:
                 warnings.warn(
-                    "Not reading file: {}. Monthly data are not read in automatically by `run`. "
-                    "Use `MAGICCData` instead.".format(filepath)
+                    "Not reading file: {}. Monthly data are only read in by `run` if "
+                    "`subannual=True`. Alternately, use `MAGICCData`.".format(filepath)
                 )
                 continue
             try:
                 openscm_var = _get_openscm_var_from_filepath(filepath)
-                if only is None or openscm_var in only:
-                    tempdata = MAGICCData(
-                        join(self.out_dir, filepath), columns=deepcopy(read_cols)
-                    )
-                    mdata.append(tempdata)
-
             except (NoReaderWriterError, InvalidTemporalResError):
                 # TODO: something like warnings.warn("Could not read {}".format(filepath))
                 continue
 
-        if not mdata and only is not None:
+            if only is None or openscm_var in only:
+                if is_subannual:
+                    to_read_subannual.append(join(self.out_dir, filepath))
+                else:
+                    to_read.append(join(self.out_dir, filepath))
+
+        n_annual = len(to_read)
+        to_read = to_read + to_read_subannual
+
+        if self._timings is not None:
+            self._timings["files_read"] = len(to_read)
+            self._timings["bytes_read"] = sum([getsize(f) for f in to_read])
+
+        read_func = functools.partial(_read_output_file, columns=read_cols)
+        with self._timed("read_output"):
+            if isinstance(parse_workers, Executor):
+                mdata = list(parse_workers.map(read_func, to_read))
+            elif parse_workers > 1 and len(to_read) > 1:
+                with ThreadPoolExecutor(max_workers=parse_workers) as executor:
+                    mdata = list(executor.map(read_func, to_read))
+            else:
+                mdata = [read_func(filepath) for filepath in to_read]
+
+        # results are in the same order as ``to_read`` however they were read
+        mdata_subannual = [m for m in mdata[n_annual:] if m is not None]
+        mdata = [m for m in mdata[:n_annual] if m is not None]
+
+        if not mdata and not mdata_subannual and only is not None:
             raise ValueError("No output found for only={}".format(only))
 
         if not mdata:
-            if self.strict:
+            if self.strict and not mdata_subannual:
                 raise ValueError("No output found. Check configuration")
             else:
                 # No data was loaded return an empty MAGICCData object
-                mdata = MAGICCData(
-                    data={},
-                    columns={
-                        "model": [],
-                        "unit": [],
-                        "variable": [],
-                        "region": [],
-                        "scenario": [],
-                    },
-                )
+                mdata = _empty_run_output()
         else:
-            mdata = run_append(mdata)
+            with self._timed("run_append"):
+                mdata = run_append(mdata)
+
+        if subannual:
+            with self._timed("run_append"):
+                mdata.metadata["subannual"] = (
+                    run_append(mdata_subannual)
+                    if mdata_subannual
+                    else _empty_run_output()
+                )
 
         try:
             run_paras = self.read_parameters()
@@ -429,7 +1080,7 @@ class MAGICCBase(object):
         except FileNotFoundError:
             pass
 
-        mdata.metadata["stderr"] = res.stderr.decode("ascii")
+        mdata.metadata["stderr"] = stderr.decode("ascii")
         levels_to_warn = ["WARNING", "ERROR", "FATAL"]
         for level in levels_to_warn:
             if level in mdata.metadata["stderr"]:
@@ -489,7 +1140,7 @@ class MAGICCBase(object):
         )
 
         nml_to_check = "nml_allcfgs"
-        usr_cfg = read_cfg_file(join(self.run_dir, "MAGCFG_USER.CFG"))
+        usr_cfg = self._read_namelist("MAGCFG_USER.CFG")
         for k in usr_cfg[nml_to_check]:
             if k.startswith("file_tuningmodel"):
                 first_tuningmodel = k in ["file_tuningmodel", "file_tuningmodel_1"]
@@ -517,7 +1168,12 @@ class MAGICCBase(object):
             The name of the file to write. The file will be written to the MAGICC
             instance's run directory i.e. ``self.run_dir``
         """
-        mdata.write(join(self.run_dir, name), self.version)
+        filepath = join(self.run_dir, name)
+        if name == self._scen_file_name:
+            self._written_scenario = None
+
+        _unlink_if_shared(filepath)
+        mdata.write(filepath, self.version)
 
     def read_parameters(self):
         """
@@ -550,6 +1206,150 @@ class MAGICCBase(object):
         if self.is_temp and self.root_dir is not None:
             shutil.rmtree(self.root_dir)
             self.root_dir = None
+            self._namelists = {}
+
+    def _record_pristine_state(self):
+        """
+        Record the current state of the run directory so it can be restored later
+
+        Configuration files are kept in memory, for everything else we only
+        record the file's size and modification time.
+        """
+        self._pristine_files = {}
+        self._pristine_contents = {}
+        for filename in listdir(self.run_dir):
+            full_filename = join(self.run_dir, filename)
+            if not isfile(full_filename):
+                continue
+
+            if filename.upper().endswith(".CFG"):
+                with open(full_filename, "rb") as fh:
+                    self._pristine_contents[filename] = fh.read()
+            else:
+                self._pristine_files[filename] = self._get_file_stamp(full_filename)
+
+    @staticmethod
+    def _get_file_stamp(filename):
+        file_stat = stat(filename)
+
+        return file_stat.st_size, file_stat.st_mtime_ns
+
+    def _reset_to_pristine_state(self):
+        """
+        Reset the run and output directories to the recorded pristine state
+
+        Any output is removed, files added to the run directory since the state was
+        recorded are removed and any modified files are restored.
+        """
+        self._clear_out_dir()
+
+        for filename in listdir(self.run_dir):
+            full_filename = join(self.run_dir, filename)
+            if isfile(full_filename) and not (
+                filename in self._pristine_files or filename in self._pristine_contents
+            ):
+                remove(full_filename)
+
+        original_run_dir = abspath(join(self.original_dir, "..", "run"))
+        for filename, contents in self._pristine_contents.items():
+            full_filename = join(self.run_dir, filename)
+            if exists(full_filename):
+                # config files are small so we can simply compare their contents
+                with open(full_filename, "rb") as fh:
+                    if fh.read() == contents:
+                        continue
+
+            _unlink_if_shared(full_filename)
+            with open(full_filename, "wb") as fh:
+                fh.write(contents)
+
+        for filename, stamp in self._pristine_files.items():
+            full_filename = join(self.run_dir, filename)
+            if exists(full_filename) and self._get_file_stamp(full_filename) == stamp:
+                continue
+
+            _unlink_if_shared(full_filename)
+            shutil.copy(join(original_run_dir, filename), full_filename)
+            self._pristine_files[filename] = self._get_file_stamp(full_filename)
+
+        self._namelists = {}
+        self.config = None
+
+    def _read_namelist(self, filename, top_level_key=None):
+        """
+        Read a namelist from the run directory
+
+        Namelists are cached in memory. The cached namelist is used unless the file
+        has been altered on disk since it was read or written by this instance.
+        Changes which have not yet been written to disk (see
+        ``_deferred_namelist_writes``) are always included.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file to read
+
+        top_level_key : str
+            If supplied and the file does not exist, an empty namelist with this key
+            is returned rather than raising an error
+
+        Returns
+        -------
+        :obj:`f90nml.Namelist`
+            Namelist. This is the cached object so must not be modified in place.
+        """
+        fname = join(self.run_dir, filename)
+        if fname in self._namelists:
+            namelist, stamp = self._namelists[fname]
+            if stamp is None or (
+                exists(fname) and self._get_file_stamp(fname) == stamp
+            ):
+                return namelist
+
+        if top_level_key is not None and not exists(fname):
+            return f90nml.Namelist({top_level_key: {}})
+
+        namelist = read_cfg_file(fname)
+        self._namelists[fname] = (namelist, self._get_file_stamp(fname))
+
+        return namelist
+
+    def _set_namelist(self, filename, namelist):
+        """
+        Set a namelist in the run directory
+
+        The namelist is written straight away unless writes are being deferred.
+        """
+        self._namelists[join(self.run_dir, filename)] = (namelist, None)
+        if not self._defer_namelist_writes:
+            self._write_namelists()
+
+    def _write_namelists(self):
+        """
+        Write all namelists which have changed since they were last written
+        """
+        with self._timed("write_config"):
+            for fname, (namelist, stamp) in self._namelists.items():
+                if stamp is not None:
+                    continue
+
+                _unlink_if_shared(fname)
+                f90nml.write(namelist, fname, force=True)
+                self._namelists[fname] = (namelist, self._get_file_stamp(fname))
+
+    @contextmanager
+    def _deferred_namelist_writes(self):
+        """
+        Context manager within which changed namelists are only held in memory
+
+        On exit, each changed namelist is written to disk exactly once.
+        """
+        self._defer_namelist_writes = True
+        try:
+            yield
+        finally:
+            self._defer_namelist_writes = False
+            self._write_namelists()
 
     def set_config(
         self,
@@ -597,12 +1397,12 @@ class MAGICCBase(object):
         """
         kwargs = self._check_and_format_config(kwargs)
 
-        fname = join(self.run_dir, filename)
-        conf = {top_level_key: kwargs}
+        conf = f90nml.Namelist({top_level_key: kwargs})
         conf = self._fix_legacy_keys(conf, conflict=conflict)
-        f90nml.write(conf, fname, force=True)
+        self._set_namelist(filename, conf)
 
-        return conf
+        # a copy so that changes to the result don't alter the namelist we hold
+        return deepcopy(conf)
 
     def update_config(
         self,
@@ -649,18 +1449,14 @@ class MAGICCBase(object):
             An invalid value for ``conflict`` is supplied
         """
         kwargs = self._check_and_format_config(kwargs)
-        fname = join(self.run_dir, filename)
-
-        if exists(fname):
-            conf = f90nml.read(fname)
-        else:
-            conf = {top_level_key: {}}
 
+        conf = deepcopy(self._read_namelist(filename, top_level_key))
         conf[top_level_key].update(kwargs)
         conf = self._fix_legacy_keys(conf, conflict=conflict)
-        f90nml.write(conf, fname, force=True)
+        self._set_namelist(filename, conf)
 
-        return conf
+        # a copy so that changes to the result don't alter the namelist we hold
+        return deepcopy(conf)
 
     def _fix_legacy_keys(self, conf, conflict="warn"):
         """
@@ -718,10 +1514,10 @@ class MAGICCBase(object):
         an obvious way. Adjusting the parameter settings still requires great care and
         may behave unepexctedly.
         """
-        # zero_emissions is imported from scenarios module
+        zero_emissions = scenarios.zero_emissions
         # TODO: setup MAGICC6 so it puts extra variables in right place and hence
         # warning about ignoring some data disappears
-        zero_emissions.write(join(self.run_dir, self._scen_file_name), self.version)
+        self.write(zero_emissions, self._scen_file_name)
 
         time = zero_emissions.filter(variable="Emissions|CH4", region="World")[
             "time"
@@ -749,7 +1545,7 @@ class MAGICCBase(object):
         co2_conc_writer.metadata = {
             "header": "Constant pre-industrial CO2 concentrations"
         }
-        co2_conc_writer.write(join(self.run_dir, co2_conc_filename), self.version)
+        self.write(co2_conc_writer, co2_conc_filename)
 
         ch4_conc_pi = 722
         ch4_conc = ch4_conc_pi * np.ones(no_timesteps)
@@ -771,7 +1567,7 @@ class MAGICCBase(object):
         ch4_conc_writer.metadata = {
             "header": "Constant pre-industrial CH4 concentrations"
         }
-        ch4_conc_writer.write(join(self.run_dir, ch4_conc_filename), self.version)
+        self.write(ch4_conc_writer, ch4_conc_filename)
 
         fgas_conc_pi = 0
         fgas_conc = fgas_conc_pi * np.ones(no_timesteps)
@@ -793,7 +1589,7 @@ class MAGICCBase(object):
         fgas_conc_writer = MAGICCData(fgas_conc_df)
         fgas_conc_filename = "HIST_ZERO_{}.IN".format(varname)
         fgas_conc_writer.metadata = {"header": "Zero concentrations"}
-        fgas_conc_writer.write(join(self.run_dir, fgas_conc_filename), self.version)
+        self.write(fgas_conc_writer, fgas_conc_filename)
 
         def_config = self.default_config
         tmp_nml = f90nml.Namelist({"nml_allcfgs": {"fgas_files_conc": 1}})
@@ -1026,7 +1822,17 @@ class MAGICCBase(object):
         else:
             ascii_binary = "BINARY"
 
-        # defaults
+        outconfig = self._get_disabled_output_config(ascii_binary)
+        for kw in kwargs:
+            val = 1 if kwargs[kw] else 0  # convert values to 0/1 instead of booleans
+            outconfig["out_" + kw.lower()] = val
+
+        self.update_config(**outconfig)
+
+    def _get_disabled_output_config(self, ascii_binary):
+        """
+        Get the output configuration which disables all of MAGICC's output
+        """
         outconfig = {
             "out_emissions": 0,
             "out_gwpemissions": 0,
@@ -1059,11 +1865,123 @@ class MAGICCBase(object):
             outconfig["out_oceanarea"] = 0
             outconfig["out_lifetimes"] = 0
 
-        for kw in kwargs:
-            val = 1 if kwargs[kw] else 0  # convert values to 0/1 instead of booleans
-            outconfig["out_" + kw.lower()] = val
+        return outconfig
 
-        self.update_config(**outconfig)
+    def _get_output_config_for_variables(self, variables):
+        """
+        Get the output configuration with which MAGICC only writes ``variables``
+
+        All other output is disabled. ``out_parameters`` and ``out_warnings`` are
+        left untouched as they don't write timeseries.
+
+        Parameters
+        ----------
+        variables : list of str
+            OpenSCM variables to write
+
+        Returns
+        -------
+        dict
+            Output configuration. If any of ``variables`` cannot be mapped to an
+            ``out_xx`` flag, ``None`` is returned as we cannot be sure that the
+            variable would be written.
+        """
+        magicc_vars = [self._get_magicc_output_variable(v) for v in variables]
+        if None in magicc_vars:
+            return None
+
+        output_flags = self._get_output_flags(magicc_vars)
+        if output_flags is None:
+            return None
+
+        outconfig = self._get_disabled_output_config("ASCII")
+        outconfig.pop("out_parameters")
+        outconfig.pop("out_warnings")
+        outconfig.update(output_flags)
+
+        return outconfig
+
+    def _get_output_flags(self, magicc_vars):
+        """
+        Get the output flags which are required to write ``magicc_vars``
+
+        Each variable is mapped to the ``out_xx`` flag which controls the file it is
+        written to using ``self._output_flags``. Output is written as ascii because
+        MAGICC6's binary output does not include units.
+
+        Parameters
+        ----------
+        magicc_vars : list of str
+            MAGICC7 variable names
+
+        Returns
+        -------
+        dict
+            Output flags to set. ``None`` if any variable cannot be mapped.
+        """
+        output_flags = {}
+        for magicc_var in magicc_vars:
+            flags = [
+                f for suffix, f in self._output_flags if magicc_var.endswith(suffix)
+            ]
+            if not flags:
+                return None
+
+            output_flags[flags[0]] = 1
+
+        return output_flags
+
+    @staticmethod
+    def _get_magicc_output_variable(variable):
+        """
+        Get the MAGICC7 name of an OpenSCM output variable
+
+        Returns ``None`` if the variable is not a known OpenSCM variable or does not
+        map back to itself (i.e. we cannot be sure which output file it comes from).
+        """
+        magicc_var = definitions.OPENSCM_TO_MAGICC7_VARIABLES_MAPPING.get(variable)
+        if magicc_var is None:
+            return None
+
+        if convert_magicc7_to_openscm_variables(magicc_var) != variable:
+            return None
+
+        return magicc_var
+
+    @contextmanager
+    def _limited_output(self, only, config_dict):
+        """
+        Context manager which limits MAGICC's output to the variables in ``only``
+
+        The required output configuration is added to ``config_dict``, which is the
+        configuration for the run. Flags which are already in ``config_dict`` are left
+        as they are. On exit, the output configuration in ``MAGTUNE_PYMAGICC.CFG``
+        is restored.
+        """
+        outconfig = None
+        if only is not None:
+            outconfig = self._get_output_config_for_variables(only)
+
+        if outconfig is None:
+            yield
+            return
+
+        user_flags = [k.lower() for k in config_dict]
+        outconfig = {k: v for k, v in outconfig.items() if k not in user_flags}
+        previous = self._read_namelist("MAGTUNE_PYMAGICC.CFG", "nml_allcfgs")
+        previous = deepcopy(previous["nml_allcfgs"])
+        config_dict.update(outconfig)
+        try:
+            yield
+        finally:
+            conf = deepcopy(self._read_namelist("MAGTUNE_PYMAGICC.CFG", "nml_allcfgs"))
+            for k in outconfig:
+                if k in previous:
+                    conf["nml_allcfgs"][k] = previous[k]
+                else:
+                    conf["nml_allcfgs"].pop(k, None)
+
+            self._set_namelist("MAGTUNE_PYMAGICC.CFG", conf)
 
     def get_executable(self):
         """
@@ -1493,8 +2411,24 @@ class MAGICCBase(object):
         -------
         dict
             Updated configuration
+
+        Notes
+        -----
+        The scenario file is only written if ``scenario`` differs from the scenario
+        which was written last (or if the scenario file has been altered since). This
+        makes running the same scenario with many different configurations cheaper.
         """
-        self.write(scenario, self._scen_file_name)
+        scen_file = join(self.run_dir, self._scen_file_name)
+        scenario_hash = _hash_scenario(scenario)
+        if (
+            self._written_scenario is None
+            or not exists(scen_file)
+            or self._written_scenario
+            != (scenario_hash, self._get_file_stamp(scen_file))
+        ):
+            self.write(scenario, self._scen_file_name)
+            self._written_scenario = (scenario_hash, self._get_file_stamp(scen_file))
+
         emis_flag = list(
             self._fix_legacy_keys(
                 f90nml.Namelist({"nml_allcfgs": {"file_emisscen": "junk"}}),
@@ -1516,6 +2450,14 @@ class MAGICC6(MAGICCBase):
     version = 6
     _scen_file_name = "SCENARIO.SCEN"
 
+    _output_flags = [
+        ("_EMIS", "out_emissions"),
+        ("_CONC", "out_concentrations"),
+        ("_RF", "out_forcing"),
+        ("SURFACE_TEMP", "out_temperature"),
+        ("SLR_TOT", "out_sealevel"),
+    ]
+
     _config_renamings = {
         "file_emisscen": "file_emissionscenario",
         "fgas_files_conc": "file_fgas_conc",
@@ -1558,7 +2500,7 @@ class MAGICC6(MAGICCBase):
             )
 
     def _check_config(self):
-        cfg = self.update_config()
+        cfg = self._read_namelist("MAGTUNE_PYMAGICC.CFG", "nml_allcfgs")
         if "file_emissionscenario" in cfg["nml_allcfgs"]:
             if cfg["nml_allcfgs"]["file_emissionscenario"].endswith("SCEN7"):
                 self._check_failed("MAGICC6 cannot run SCEN7 files")
@@ -1573,6 +2515,16 @@ class MAGICC7(MAGICCBase):
         "mhalo_switch_conc2emis_yr": "mhalo_switchfromconc2emis_year",
     }
 
+    def _get_output_flags(self, magicc_vars):
+        # MAGICC7 can write individual variables so we don't need to enable whole
+        # groups of output. Version 2 binary files include units and are much quicker
+        # to write and read than ascii files.
+        return {
+            "out_dynamic_vars": ["DAT_{}".format(v) for v in magicc_vars],
+            "out_ascii_binary": "BINARY",
+            "out_binary_format": 2,
+        }
+
     def create_copy(self):
         """
         Initialises a temporary directory structure and copy of MAGICC
@@ -1630,6 +2582,34 @@ class MAGICC7(MAGICCBase):
         pass
 
 
+def _get_magicc_class(magicc_version):
+    """
+    Get the MAGICC class for a given MAGICC version
+
+    Parameters
+    ----------
+    magicc_version : int
+        MAGICC version
+
+    Returns
+    -------
+    :class:`MAGICCBase`
+        The class which wraps the requested MAGICC version
+
+    Raises
+    ------
+    ValueError
+        If the magicc_version is not available
+    """
+    if magicc_version == 6:
+        return MAGICC6
+
+    if magicc_version == 7:
+        return MAGICC7
+
+    raise ValueError("MAGICC version {} is not available".format(magicc_version))
+
+
 def _filter_time_range(scmdf, filter_func):
     # TODO: move into openscm
     tdf = scmdf.timeseries()
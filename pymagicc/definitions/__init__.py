@@ -11,13 +11,40 @@ For more details about how these constants are used, see the documentation of
 ``pymagicc.io``. In particular, the documentation of
 ``pymagicc.io.get_special_scen_code``, ``pymagicc.io.get_dattype_regionmode`` and
 ``pymagicc.io.get_region_order`` in :ref:`pymagicc.io`.
+
+Reading the Data Packages and building the mappings between MAGICC7 and OpenSCM
+variables is relatively slow. Hence, the following definitions are only built the
+first time they are accessed (after which they are kept so later accesses are free):
+
+- ``DATTYPE_REGIONMODE_REGIONS``, :obj:`pandas.DataFrame`: mapping between regions and
+  whether a file is SCEN7 or not and the expected values of THISFILE_DATTYPE and
+  THISFILE_REGIONMODE flags in MAGICC
+- ``MAGICC7_EMISSIONS_UNITS``, :obj:`pandas.DataFrame`: definitions of emissions
+  variables and their expected units in MAGICC7
+- ``PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0``, list: the emissions which are included
+  in a SCEN file if the SCEN emms code is 0 (see
+  ``pymagicc.io.get_special_scen_code``)
+- ``PART_OF_SCENFILE_WITH_EMISSIONS_CODE_1``, list: the emissions which are included
+  in a SCEN file if the SCEN emms code is 1 (see
+  ``pymagicc.io.get_special_scen_code``)
+- ``PART_OF_PRNFILE``, list: the emissions which are included in a ``.prn`` file
+- ``MAGICC7_CONCENTRATIONS_UNITS``, :obj:`pandas.DataFrame`: definitions of
+  concentrations variables and their expected units in MAGICC7
+- ``MAGICC7_TO_OPENSCM_VARIABLES_MAPPING``, dict: mappings from MAGICC7 variables to
+  OpenSCM variables
+- ``OPENSCM_TO_MAGICC7_VARIABLES_MAPPING``, dict: mappings from OpenSCM variables to
+  MAGICC7 variables
+
+Code within Pymagicc should access these definitions as attributes of this module at
+the time they are needed (rather than importing them) so that importing Pymagicc does
+not trigger building them.
 """
 import functools
+import sys
 import warnings
 from pathlib import Path
 
 import pandas as pd
-from pandas_datapackage_reader import read_datapackage
 
 from pymagicc.utils import apply_string_substitutions
 
@@ -32,49 +59,32 @@ We copy this straight from pyam_ to maintain easy compatibility.
 path = Path(__file__).parent
 
 
-_dtrm = read_datapackage(path, "magicc_dattype_regionmode_regions")
+def _read_definitions_datapackage(name):
+    # imported here because the import itself is slow and only needed the first time
+    # a definition is used
+    from pandas_datapackage_reader import read_datapackage
 
-_region_cols = _dtrm.columns.to_series().apply(lambda x: x.startswith("region"))
+    return read_datapackage(path, name)
 
-DATTYPE_REGIONMODE_REGIONS = _dtrm.loc[:, ~_region_cols].copy()
-""":obj:`pandas.DataFrame` Mapping between regions and whether a file is SCEN7 or not and the expected values of THISFILE_DATTYPE and THISFILE_REGIONMODE flags in MAGICC.
-"""
 
-DATTYPE_REGIONMODE_REGIONS["regions"] = [
-    [r for r in raw if not pd.isnull(r)]
-    for raw in _dtrm.loc[:, _region_cols].values.tolist()
-]
+def _load_dattype_regionmode_regions():
+    dtrm = _read_definitions_datapackage("magicc_dattype_regionmode_regions")
+    region_cols = dtrm.columns.to_series().apply(lambda x: x.startswith("region"))
 
-MAGICC7_EMISSIONS_UNITS = read_datapackage(path, "magicc_emissions_units")
-""":obj:`pandas.DataFrame` Definitions of emissions variables and their expected units in MAGICC7.
-"""
+    dattype_regionmode_regions = dtrm.loc[:, ~region_cols].copy()
+    dattype_regionmode_regions["regions"] = [
+        [r for r in raw if not pd.isnull(r)]
+        for raw in dtrm.loc[:, region_cols].values.tolist()
+    ]
 
-PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0 = MAGICC7_EMISSIONS_UNITS[
-    MAGICC7_EMISSIONS_UNITS["part_of_scenfile_with_emissions_code_0"]
-]["magicc_variable"].tolist()
-"""list: The emissions which are included in a SCEN file if the SCEN emms code is 0.
+    return dattype_regionmode_regions
 
-See documentation of ``pymagicc.io.get_special_scen_code`` for more details.
-"""
 
-PART_OF_SCENFILE_WITH_EMISSIONS_CODE_1 = MAGICC7_EMISSIONS_UNITS[
-    MAGICC7_EMISSIONS_UNITS["part_of_scenfile_with_emissions_code_1"]
-]["magicc_variable"].tolist()
+def _get_flagged_emissions(flag):
+    emissions_units = _get_definition("MAGICC7_EMISSIONS_UNITS")
 
-"""list: The emissions which are included in a SCEN file if the SCEN emms code is 1.
+    return emissions_units[emissions_units[flag]]["magicc_variable"].tolist()
 
-See documentation of ``pymagicc.io.get_special_scen_code`` for more details.
-"""
-
-PART_OF_PRNFILE = MAGICC7_EMISSIONS_UNITS[MAGICC7_EMISSIONS_UNITS["part_of_prnfile"]][
-    "magicc_variable"
-].tolist()
-"""list: The emissions which are included in a ``.prn`` file.
-"""
-
-MAGICC7_CONCENTRATIONS_UNITS = read_datapackage(path, "magicc_concentrations_units")
-""":obj:`pandas.DataFrame` Definitions of concentrations variables and their expected units in MAGICC7.
-"""
 
 AR6_REGION_ABBREVIATIONS = [
     "GIC",
@@ -406,7 +416,8 @@ def get_magicc7_to_openscm_variable_mapping(inverse=False):
         return DATA_HIERARCHY_SEPARATOR.join([prefix, variable])
 
     magicc7_suffixes = ["_EMIS", "_CONC", "_ERF", "_RF", "_OT", "_INVERSE_EMIS"]
-    magicc7_base_vars = MAGICC7_EMISSIONS_UNITS.magicc_variable.tolist() + [
+    emissions_units = _get_definition("MAGICC7_EMISSIONS_UNITS")
+    magicc7_base_vars = emissions_units.magicc_variable.tolist() + [
         "SOLAR",
         "VOLCANIC",
         "CO2EQ",
@@ -543,29 +554,18 @@ def get_magicc7_to_openscm_variable_mapping(inverse=False):
     return replacements
 
 
-MAGICC7_TO_OPENSCM_VARIABLES_MAPPING = get_magicc7_to_openscm_variable_mapping()
-"""dict: Mappings from MAGICC7 variables to OpenSCM variables
-"""
-
-OPENSCM_TO_MAGICC7_VARIABLES_MAPPING = get_magicc7_to_openscm_variable_mapping(
-    inverse=True
-)
-"""dict: Mappings from OpenSCM variables to MAGICC7 variables
-"""
-
-
 @functools.lru_cache(None)
 def _apply_convert_magicc7_to_openscm_variables(v, inverse):
     if inverse:
         return apply_string_substitutions(
             v,
-            OPENSCM_TO_MAGICC7_VARIABLES_MAPPING,
+            _get_definition("OPENSCM_TO_MAGICC7_VARIABLES_MAPPING"),
             unused_substitutions="ignore",  # TODO: make this warn and see what happens
         )
     else:
         return apply_string_substitutions(
             v,
-            MAGICC7_TO_OPENSCM_VARIABLES_MAPPING,
+            _get_definition("MAGICC7_TO_OPENSCM_VARIABLES_MAPPING"),
             unused_substitutions="ignore",  # TODO: make this warn and see what happens
             case_insensitive=True,  # MAGICC variables are case insensitive
         )
@@ -867,3 +867,51 @@ def convert_pint_to_fortran_safe_units(units, inverse=False):
         return apply_string_substitutions(units, FORTRAN_SAFE_TO_PINT_UNITS_MAPPING)
     else:
         return apply_string_substitutions(units, PINT_TO_FORTRAN_SAFE_UNITS_MAPPING)
+
+
+_DEFINITION_LOADERS = {
+    "DATTYPE_REGIONMODE_REGIONS": _load_dattype_regionmode_regions,
+    "MAGICC7_EMISSIONS_UNITS": functools.partial(
+        _read_definitions_datapackage, "magicc_emissions_units"
+    ),
+    "PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0": functools.partial(
+        _get_flagged_emissions, "part_of_scenfile_with_emissions_code_0"
+    ),
+    "PART_OF_SCENFILE_WITH_EMISSIONS_CODE_1": functools.partial(
+        _get_flagged_emissions, "part_of_scenfile_with_emissions_code_1"
+    ),
+    "PART_OF_PRNFILE": functools.partial(_get_flagged_emissions, "part_of_prnfile"),
+    "MAGICC7_CONCENTRATIONS_UNITS": functools.partial(
+        _read_definitions_datapackage, "magicc_concentrations_units"
+    ),
+    "MAGICC7_TO_OPENSCM_VARIABLES_MAPPING": get_magicc7_to_openscm_variable_mapping,
+    "OPENSCM_TO_MAGICC7_VARIABLES_MAPPING": functools.partial(
+        get_magicc7_to_openscm_variable_mapping, inverse=True
+    ),
+}
+"""dict: Functions which build each of the definitions which are built on first use"""
+
+
+def _get_definition(name):
+    if name not in globals():
+        globals()[name] = _DEFINITION_LOADERS[name]()
+
+    return globals()[name]
+
+
+def __getattr__(name):
+    # only called if ``name`` isn't already a module attribute
+    if name not in _DEFINITION_LOADERS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    return _get_definition(name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_DEFINITION_LOADERS))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # module level __getattr__ is not supported so build everything up front
+    for _name in _DEFINITION_LOADERS:
+        _get_definition(_name)
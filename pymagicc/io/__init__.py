@@ -257,6 +257,19 @@ def _read_metadata_and_df(filepath):
     return Reader(filepath).read()
 
 
+def _prepare_read_data(data, read_columns, columns=None):
+    data.columns = range(len(data.columns))
+    columns = deepcopy(columns) if columns is not None else {}
+    for k, v in read_columns.items():
+        columns.setdefault(k, v)
+
+    columns.setdefault("model", ["unspecified"])
+    columns.setdefault("scenario", ["unspecified"])
+    columns.setdefault("climate_model", ["unspecified"])
+
+    return data, columns
+
+
 def read_mag_file_metadata(filepath):
     """
     Read only the metadata in a ``.MAG`` file
@@ -528,14 +541,7 @@ class MAGICCData(ScmRun):
             filepath = data  # assume filepath
             self.filepath = filepath
             metadata, data, read_columns = _read_metadata_and_df(filepath)
-            data.columns = range(len(data.columns))
-            columns = deepcopy(columns) if columns is not None else {}
-            for k, v in read_columns.items():
-                columns.setdefault(k, v)
-
-            columns.setdefault("model", ["unspecified"])
-            columns.setdefault("scenario", ["unspecified"])
-            columns.setdefault("climate_model", ["unspecified"])
+            data, columns = _prepare_read_data(data, read_columns, columns)
 
             super().__init__(data, columns=columns, **kwargs)
             self.metadata = metadata
@@ -569,3 +575,114 @@ class MAGICCData(ScmRun):
         """
         writer = determine_tool(filepath, "writer")(magicc_version=magicc_version)
         writer.write(self, filepath)
+
+
+def _get_compact_out_reader(filepath, variables, regions, years):
+    _check_file_exists(filepath)
+    reader_cls = determine_tool(filepath, "reader")
+    if not issubclass(reader_cls, _CompactOutReader):
+        raise ValueError("{} is not a compact output file".format(filepath))
+
+    return reader_cls(filepath, variables=variables, regions=regions, years=years)
+
+
+def _compact_out_to_magicc_data(filepath, metadata, data, read_columns):
+    mdata = MAGICCData(*_prepare_read_data(data, read_columns))
+    mdata.filepath = filepath
+    mdata.metadata = metadata
+
+    return mdata
+
+
+def read_compact_out(filepath, variables=None, regions=None, years=None):
+    """
+    Read selected timeseries from a compact output file
+
+    Compact output files (``COMPACT.OUT`` and ``COMPACT.BINOUT``) contain every
+    timeseries for every run. Only the parameters and the selected timeseries are read
+    (for ``COMPACT.BINOUT`` files only these values are read from disk) so this is
+    much cheaper than reading the entire file with :class:`MAGICCData` and then
+    filtering.
+
+    Parameters
+    ----------
+    filepath : str
+        Compact output file to read
+
+    variables : str or list of str
+        Variables to read. Patterns are matched in the same way as
+        :meth:`scmdata.ScmRun.filter`. If ``None``, all variables are read.
+
+    regions : str or list of str
+        Regions to read. Patterns are matched in the same way as
+        :meth:`scmdata.ScmRun.filter`. If ``None``, all regions are read.
+
+    years : int or list of int
+        Years to read. If ``None``, all years are read.
+
+    Returns
+    -------
+    :obj:`MAGICCData`
+        The selected timeseries
+
+    Raises
+    ------
+    ValueError
+        ``filepath`` is not a compact output file
+    """
+    reader = _get_compact_out_reader(filepath, variables, regions, years)
+
+    return _compact_out_to_magicc_data(filepath, *reader.read())
+
+
+def iter_compact_out(
+    filepath, runs_per_chunk=1000, variables=None, regions=None, years=None
+):
+    """
+    Read a compact output file a limited number of runs at a time
+
+    Compact output files (``COMPACT.OUT`` and ``COMPACT.BINOUT``) contain one line
+    per run. :class:`MAGICCData` reads all the runs at once whereas this function
+    only ever holds ``runs_per_chunk`` runs in memory, hence very large ensembles can
+    be processed with constant memory.
+
+    Parameters
+    ----------
+    filepath : str
+        Compact output file to read
+
+    runs_per_chunk : int
+        Maximum number of runs in each chunk
+
+    variables : str or list of str
+        Variables to read, see :func:`read_compact_out`
+
+    regions : str or list of str
+        Regions to read, see :func:`read_compact_out`
+
+    years : int or list of int
+        Years to read, see :func:`read_compact_out`
+
+    Returns
+    -------
+    iterator of :obj:`MAGICCData`
+        The runs in the file, ``runs_per_chunk`` at a time. The ``run_id`` of each
+        run is the same as if the entire file had been read at once.
+
+    Raises
+    ------
+    ValueError
+        ``filepath`` is not a compact output file or ``runs_per_chunk`` is less than
+        one
+    """
+    if runs_per_chunk < 1:
+        raise ValueError("runs_per_chunk must be at least 1")
+
+    reader = _get_compact_out_reader(filepath, variables, regions, years)
+
+    return _iter_compact_out(reader, runs_per_chunk)
+
+
+def _iter_compact_out(reader, runs_per_chunk):
+    for read_output in reader.iter_read(runs_per_chunk):
+        yield _compact_out_to_magicc_data(reader.filepath, *read_output)
@@ -1,4 +1,6 @@
+import mmap
 import re
+import struct
 
 import numpy as np
 import pandas as pd
@@ -14,45 +16,104 @@ from pymagicc.io.base import _Reader
 
 class _BinData(object):
     def __init__(self, filepath):
-        # read the entire file into memory
+        # map the file into memory rather than reading it so that the only copy made
+        # is when the data is assembled into its final array
         with open(filepath, "rb") as fh:
-            self.data = fh.read()
-        self.data = memoryview(self.data)
+            try:
+                self._buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty files can't be mapped
+                self._buffer = b""
+        self.data = memoryview(self._buffer)
         self.pos = 0
 
-    def read_chunk(self, t):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def close(self):
         """
-        Read out the next chunk of memory
+        Release the memory map
 
-        Values in fortran binary streams begin and end with the number of bytes
-        :param t: Data type (same format as used by struct).
-        :return: Numpy array if the variable is an array, otherwise a scalar.
+        If views of the data (as returned by :meth:`read_chunk`) still exist, the map
+        is instead released once they have been garbage collected.
         """
-        size = self.data[self.pos : self.pos + 4].cast("i")[0]
-        d = self.data[self.pos + 4 : self.pos + 4 + size]
+        try:
+            self.data.release()
+            if isinstance(self._buffer, mmap.mmap):
+                self._buffer.close()
+        except BufferError:
+            pass
 
-        actual_size = self.data[self.pos + 4 + size : self.pos + 4 + size + 4].cast(
-            "i"
-        )[0]
+    def read_record(self):
+        """
+        Read out the next record
+
+        Values in fortran binary streams begin and end with the number of bytes
+        :return: Read-only view of the record's data
+        """
+        (size,) = struct.unpack_from("i", self.data, self.pos)
+        start = self.pos + 4
+        (actual_size,) = struct.unpack_from("i", self.data, start + size)
 
         if not actual_size == size:
             raise AssertionError(
                 "Expected data size: {}, got: {}".format(size, actual_size)
             )
 
-        self.pos = self.pos + 4 + size + 4
+        self.pos = start + size + 4
+
+        return self.data[start : start + size]
 
-        res = np.array(d.cast(t))
+    def read_chunk(self, t):
+        """
+        Read out the next chunk of memory
+
+        Values in fortran binary streams begin and end with the number of bytes
+        :param t: Data type (same format as used by struct).
+        :return: Numpy array if the variable is an array, otherwise a scalar. Arrays
+            are read-only views of the underlying file, they are not copies.
+        """
+        res = np.frombuffer(self.read_record(), dtype=t)
 
         # Return as a scalar or a numpy array if it is an array
         if res.size == 1:
             return res[0]
         return res
 
+    def read_str(self):
+        """
+        Read out the next chunk of memory as a string
+
+        :return: The decoded string
+        """
+        return bytes(self.read_record()).decode()
+
     def reset(self):
         self.pos = 0
 
 
+def _get_time_index(metadata):
+    """
+    Get the time axis of a binary file
+
+    Annual files are indexed by year. Sub-annual (i.e. monthly) files are indexed by
+    MAGICC's decimal years (see :mod:`pymagicc.magicc_time`), exactly as they are
+    written in the equivalent ASCII output files, so that both are read identically.
+    """
+    firstyear = int(metadata["firstyear"])
+    lastyear = int(metadata["lastyear"])
+    annualsteps = int(metadata["annualsteps"])
+    if annualsteps == 1:
+        return np.arange(firstyear, lastyear + 1)
+
+    steps = np.arange(firstyear * annualsteps, (lastyear + 1) * annualsteps)
+
+    return np.round(steps / annualsteps, 3)  # match MAGICC precision
+
+
 class _LegacyBinFormat:
     version = None
 
@@ -64,9 +125,9 @@ class _LegacyBinFormat:
             "lastyear": stream.read_chunk("I"),
             "annualsteps": stream.read_chunk("I"),
         }
-        if metadata["annualsteps"] != 1:
+        if metadata["annualsteps"] not in (1, 12):
             raise InvalidTemporalResError(
-                "{}: Only annual files can currently be processed".format(
+                "{}: Only annual and monthly files can currently be processed".format(
                     reader.filepath
                 )
             )
@@ -88,7 +149,7 @@ class _LegacyBinFormat:
             MAGICCData format
         metadata (dict): updated metadata based on the processing performed
         """
-        index = np.arange(metadata["firstyear"], metadata["lastyear"] + 1)
+        index = _get_time_index(metadata)
 
         # The first variable is the global values
         globe = stream.read_chunk("d")
@@ -102,7 +163,8 @@ class _LegacyBinFormat:
         if metadata["datacolumns"] == 1:
             num_boxes = 0
 
-            data = globe[:, np.newaxis]
+            # copy so the output doesn't hold on to the underlying file
+            data = np.array(globe[:, np.newaxis])
 
             regions = ["World"]
 
@@ -144,36 +206,24 @@ class _LegacyBinFormat:
 class _V2BinFormat(_LegacyBinFormat):
     version = 2
 
-    @staticmethod
-    def process_variable(stream):
-        def _read_str(s):
-            bytes = np.atleast_1d(s.read_chunk("c"))
-            return b"".join(bytes.tolist()).decode()
-
-        var_name = _read_str(stream)
-        region = _read_str(stream)
-        units = _read_str(stream)
-
-        data = stream.read_chunk("d")
-
-        return {"variable": var_name, "region": region, "unit": units}, data
-
     @classmethod
     def process_data(cls, reader, stream, metadata):
-        index = np.arange(metadata["firstyear"], metadata["lastyear"] + 1)
-
-        columns = {}
-        data = []
-        for i in range(metadata["datacolumns"]):
-            column_header, column_data = cls.process_variable(stream)
-
-            for k in column_header:
-                if k not in columns:
-                    columns[k] = []
-                columns[k].append(column_header[k])
-            data.append(column_data)
-
-        df = pd.DataFrame(np.asarray(data).T, index=index)
+        index = _get_time_index(metadata)
+
+        # Each column is stored as its variable, region and unit followed by its
+        # values. We read the values straight into a single array (one row per
+        # column, transposed without copying below) and decode the headers directly
+        # from the file rather than going via numpy.
+        n_columns = int(metadata["datacolumns"])
+        columns = {"variable": [], "region": [], "unit": []}
+        data = np.empty((n_columns, len(index)))
+        for i in range(n_columns):
+            columns["variable"].append(stream.read_str())
+            columns["region"].append(stream.read_str())
+            columns["unit"].append(stream.read_str())
+            data[i, :] = stream.read_chunk("d")
+
+        df = pd.DataFrame(data.T, index=index)
 
         if isinstance(df.index, pd.core.indexes.numeric.Float64Index):
             df.index = df.index.to_series().round(3)
@@ -219,14 +269,12 @@ class _BinaryOutReader(_Reader):
             raise ValueError("{}: unexpected header format".format(self.filepath))
 
     def read(self):
-        # Read the entire file into memory
-        data = _BinData(self.filepath)
-
-        file_version = self._determine_bin_version(data)
-        self.format = get_bin_format(file_version)
+        with _BinData(self.filepath) as data:
+            file_version = self._determine_bin_version(data)
+            self.format = get_bin_format(file_version)
 
-        metadata = self.process_header(data)
-        df, metadata, columns = self.process_data(data, metadata)
+            metadata = self.process_header(data)
+            df, metadata, columns = self.process_data(data, metadata)
 
         return metadata, df, columns
 
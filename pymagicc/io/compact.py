@@ -1,4 +1,9 @@
+import io
+import itertools
+
+import numpy as np
 import pandas as pd
+from scmdata.filters import pattern_match
 
 from pymagicc.definitions import (
     convert_magicc7_to_openscm_variables,
@@ -6,6 +11,7 @@ from pymagicc.definitions import (
 )
 
 from .base import _Reader
+from .binout import _BinData
 
 
 def find_parameter_groups(columns):
@@ -51,165 +57,302 @@ def find_parameter_groups(columns):
     return {k: sorted(v) for k, v in cols_to_merge.items()}
 
 
+def _split_timeseries_ids(ts_cols):
+    # timeseries columns are ``variable__region__year``, the MAGICC names are
+    # converted once per unique variable and region
+    ids = pd.DataFrame([c.split("__") for c in ts_cols], columns=[0, 1, 2])
+    # Make sure all the year strings are four characters long. Not the best test,
+    # but as good as we can do for now.
+    if not (ids[2].str.len() == 4).all():  # pragma: no cover # safety valve
+        raise NotImplementedError("Non-annual data not yet supported")
+
+    variables = {
+        v: convert_magicc7_to_openscm_variables(v.replace("DAT_", ""))
+        for v in ids[0].unique()
+    }
+    regions = {r: convert_magicc_to_openscm_regions(r) for r in ids[1].unique()}
+
+    return pd.DataFrame(
+        {
+            "variable": ids[0].map(variables),
+            "region": ids[1].map(regions),
+            "year": ids[2].astype(int),
+        }
+    )
+
+
 class _CompactOutReader(_Reader):
+    def __init__(self, filepath, variables=None, regions=None, years=None):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        filepath : str
+            File to read
+
+        variables : str or list of str
+            Only read these (OpenSCM) variables. Patterns are matched in the same way
+            as :meth:`scmdata.ScmRun.filter`. If ``None``, all variables are read.
+
+        regions : str or list of str
+            Only read these (OpenSCM) regions. Patterns are matched in the same way
+            as :meth:`scmdata.ScmRun.filter`. If ``None``, all regions are read.
+
+        years : int or list of int
+            Only read these years. If ``None``, all years are read.
+        """
+        super().__init__(filepath)
+        self.variables = variables
+        self.regions = regions
+        self.years = years
+
     def read(self):
         compact_table = self._read_compact_table()
 
         return self._convert_compact_table_to_df_metadata_column_headers(compact_table)
 
+    def iter_read(self, runs_per_chunk):
+        """
+        Read the file ``runs_per_chunk`` runs at a time
+
+        Parameters
+        ----------
+        runs_per_chunk : int
+            Maximum number of runs to read at once
+
+        Returns
+        -------
+        iterator of tuple
+            Metadata, data and column headers of each chunk, in the same format as
+            returned by :meth:`read`
+        """
+        for compact_table in self._iter_compact_tables(runs_per_chunk):
+            yield self._convert_compact_table_to_df_metadata_column_headers(
+                compact_table
+            )
+
     def _read_compact_table(self):
+        (compact_table,) = list(self._iter_compact_tables())
+
+        return compact_table
+
+    def _iter_compact_tables(self, runs_per_chunk=None):
+        # if ``runs_per_chunk`` is None, the entire table (even if it has no runs) is
+        # returned as a single chunk
         with open(self.filepath, "r") as fh:
             headers = self._read_header(fh)
-            # TODO: change to reading a limited number of lines
-            lines_as_dicts = [line for line in self._read_lines(fh, headers)]
+            columns = self._get_selected_columns(headers)
+            if columns is None:
+                columns = np.arange(len(headers))
+
+            selected_headers = [headers[i] for i in columns]
+            start = 0
+            while True:
+                lines = list(itertools.islice(fh, runs_per_chunk))
+                if not lines and runs_per_chunk is not None:
+                    break
+
+                # pandas pads short lines and, if only some columns are read, drops
+                # extra values so we check every line before parsing it
+                self._check_lines(lines, headers)
+                stop = start + len(lines)
+                if lines:
+                    values = pd.read_csv(
+                        io.StringIO("".join(lines)),
+                        header=None,
+                        index_col=False,
+                        usecols=columns,
+                        dtype=float,
+                        engine="c",
+                        low_memory=False,
+                    ).to_numpy()
+                else:
+                    values = np.empty((0, len(columns)))
+
+                yield pd.DataFrame(
+                    values, columns=selected_headers, index=pd.RangeIndex(start, stop)
+                )
 
-        return pd.DataFrame(lines_as_dicts)
+                start = stop
+                if runs_per_chunk is None:
+                    break
 
     def _read_header(self, fh):
         line = fh.readline().strip(",\n")
         return [item.strip('"') for item in line.split(",")]
 
-    def _read_lines(self, fh, headers):
-        for line in fh:
-            toks = line.strip(",\n").split(",")
-
-            if not len(toks) == len(headers):
+    def _get_selected_columns(self, headers):
+        """
+        Get the indices of the columns to read
+
+        All the parameter columns are read, timeseries columns are only read if they
+        match the requested variables, regions and years.
+
+        Returns
+        -------
+        :obj:`np.ndarray` of int
+            Sorted indices of the columns to read. ``None`` if no selection was
+            requested i.e. all columns should be read.
+        """
+        if self.variables is None and self.regions is None and self.years is None:
+            return None
+
+        is_ts = np.array(["__" in h for h in headers], dtype=bool)
+        ts_indices = np.flatnonzero(is_ts)
+        ids = _split_timeseries_ids([headers[i] for i in ts_indices])
+
+        keep = np.ones(len(ids), dtype=bool)
+        if self.variables is not None:
+            keep &= pattern_match(pd.Categorical(ids["variable"]), self.variables)
+        if self.regions is not None:
+            keep &= pattern_match(pd.Categorical(ids["region"]), self.regions)
+        if self.years is not None:
+            keep &= ids["year"].isin(np.atleast_1d(self.years)).to_numpy()
+
+        return np.sort(np.concatenate([np.flatnonzero(~is_ts), ts_indices[keep]]))
+
+    def _check_lines(self, lines, headers):
+        for line in lines:
+            if not line.strip(",\n").count(",") + 1 == len(headers):
                 raise AssertionError("# headers does not match # lines")
 
-            yield {h: float(v) for h, v in zip(headers, toks)}
-
     def _convert_compact_table_to_df_metadata_column_headers(self, compact_table):
         ts_cols = [c for c in compact_table if "__" in c]
         para_cols = [c for c in compact_table if "__" not in c]
 
-        ts = compact_table[ts_cols]
-        ts = ts.T
-
-        def sort_ts_ids(inid):
-            variable, region, year = inid.split("__")
-            variable = variable.replace("DAT_", "")
-
-            return {"variable": variable, "region": region, "year": year}
-
-        ts["variable"] = ts.index.map(
-            lambda x: convert_magicc7_to_openscm_variables(
-                x.split("__")[0].replace("DAT_", "")
-            )
-        )
-        ts["region"] = ts.index.map(
-            lambda x: convert_magicc_to_openscm_regions(x.split("__")[1])
-        )
-
-        ts["year"] = ts.index.map(lambda x: x.split("__")[2])
-        # Make sure all the year strings are four characters long. Not the best test,
-        # but as good as we can do for now.
-        if not (ts["year"].apply(len) == 4).all():  # pragma: no cover # safety valve
-            raise NotImplementedError("Non-annual data not yet supported")
-
-        ts["year"] = ts["year"].astype(int)
+        # we know the layout of the timeseries columns so we can build the output by
+        # placing each column in a (run, timeseries, year) array rather than
+        # pivoting the whole table
+        ids = _split_timeseries_ids(ts_cols)
+        ts_codes, ts_ids = pd.factorize(list(zip(ids["variable"], ids["region"])))
+        year_codes, years = pd.factorize(ids["year"], sort=True)
 
-        ts = ts.reset_index(drop=True)
+        n_runs = compact_table.shape[0]
+        n_ts = len(ts_ids)
+        values = np.full((n_runs, n_ts, len(years)), np.nan)
+        values[:, ts_codes, year_codes] = compact_table[ts_cols].to_numpy()
 
-        id_cols = {"variable", "region", "year"}
-        run_cols = set(ts.columns) - id_cols
-        ts = ts.melt(value_vars=run_cols, var_name="run_id", id_vars=id_cols)
+        df = pd.DataFrame(values.reshape(n_runs * n_ts, len(years)).T, index=years)
 
-        ts["unit"] = "unknown"
+        def _repeat_for_each_timeseries(run_values):
+            return [v for v in run_values for _ in range(n_ts)]
 
-        new_index = list(set(ts.columns) - {"value"})
-        ts = ts.set_index(new_index)["value"].unstack("year")
-
-        paras = compact_table[para_cols]
-        paras.index.name = "run_id"
+        column_headers = {
+            "run_id": _repeat_for_each_timeseries(compact_table.index.tolist()),
+            "variable": [v for v, _ in ts_ids] * n_runs,
+            "region": [r for _, r in ts_ids] * n_runs,
+            "unit": ["unknown"] * (n_runs * n_ts),
+        }
 
-        cols_to_merge = find_parameter_groups(paras.columns.tolist())
+        cols_to_merge = find_parameter_groups(para_cols)
+        grouped_cols = {c for components in cols_to_merge.values() for c in components}
+        for col in para_cols:
+            if col not in grouped_cols:
+                column_headers[col.lower()] = _repeat_for_each_timeseries(
+                    compact_table[col].tolist()
+                )
 
-        paras_clean = paras.copy()
         # Aggregate the columns
         for new_col, components in cols_to_merge.items():
-            components = sorted(components)
-            paras_clean.loc[:, new_col] = tuple(paras[components].values.tolist())
-            paras_clean = paras_clean.drop(columns=components)
-
-        years = ts.columns.tolist()
-        ts = ts.reset_index().set_index("run_id")
-        out = pd.merge(ts, paras_clean, left_index=True, right_index=True).reset_index()
-
-        id_cols = set(out.columns) - set(years)
-        out = out.melt(value_vars=years, var_name="year", id_vars=id_cols)
-        new_index = list(set(out.columns) - {"value"})
-        out = out.set_index(new_index)["value"].unstack("year")
-        out = out.T
+            column_headers[new_col.lower()] = _repeat_for_each_timeseries(
+                [tuple(v) for v in compact_table[components].values.tolist()]
+            )
 
-        column_headers = {
-            name.lower(): out.columns.get_level_values(name).tolist()
-            for name in out.columns.names
-        }
-        df = out.copy()
         metadata = {}
 
         return metadata, df, column_headers
 
 
 class _BinaryCompactOutReader(_CompactOutReader):
-    def _read_compact_table(self):
-        with open(self.filepath, "rb") as fh:
-            headers = self._read_header(fh)
-            # can change to reading limited number of lines in future
-            lines_as_dicts = [line for line in self._read_lines(fh, headers)]
+    def _iter_compact_tables(self, runs_per_chunk=None):
+        with _BinData(self.filepath) as data:
+            headers = self._read_header(data)
+            rows = self._read_rows(data, headers)
+            columns = self._get_selected_columns(headers)
+            if columns is not None:
+                headers = [headers[i] for i in columns]
+
+            if runs_per_chunk is None:
+                # the entire table (even if it has no runs) is a single chunk
+                starts = [0]
+                runs_per_chunk = len(rows)
+            else:
+                starts = range(0, len(rows), runs_per_chunk)
+
+            for start in starts:
+                stop = min(start + runs_per_chunk, len(rows))
+                yield pd.DataFrame(
+                    self._read_values(rows[start:stop], columns),
+                    columns=headers,
+                    index=pd.RangeIndex(start, stop),
+                )
 
-        return pd.DataFrame(lines_as_dicts)
+            del rows
 
-    def _read_header(self, fh):
-        first_value = self._read_item(fh).tobytes()
+    def _read_header(self, data):
+        first_value = data.read_record().tobytes()
         if not first_value == b"COMPACT_V1":
             raise AssertionError("Unexpected first value: {}".format(first_value))
 
-        second_value = self._read_item(fh).tobytes()
+        second_value = data.read_record().tobytes()
         if not second_value == b"HEAD":
             raise AssertionError("Unexpected second value: {}".format(second_value))
 
         items = []
-        while True:
-            item = self._read_item(fh)
-            if item is None or item.tobytes() == b"END":
+        while data.pos < len(data.data):
+            item = data.read_record().tobytes()
+            if item == b"END":
                 break
-            items.append(item.tobytes().decode())
+            items.append(item.decode())
 
         return items
 
-    def _read_lines(self, fh, headers):
-        while True:
+    def _read_rows(self, data, headers):
+        # Every row is a fixed size record of 4 byte floats followed by an END record
+        # so the entire data section can be viewed as an array of structured records
+        # rather than being read record by record
+        row_dtype = _get_row_dtype(len(headers))
+        n_bytes = len(data.data) - data.pos
+        if n_bytes % row_dtype.itemsize:
+            raise AssertionError("# headers does not match # lines")
 
-            items = self._read_item(fh)
-            if items is None:
-                break
+        return np.frombuffer(data.data, dtype=row_dtype, offset=data.pos)
 
-            # Read the values as an array of floats (4 byte)
-            items = items.cast("f")
-            if len(items) != len(headers):
-                raise AssertionError("# headers does not match # lines")
+    def _read_values(self, rows, columns=None):
+        if not (rows["size"] == rows["size_after"]).all():
+            raise AssertionError("Wrong size after data")
 
-            # Check the line terminator
-            item = self._read_item(fh)
-            if not item.tobytes() == b"END":
-                raise AssertionError(
-                    "Unexpected final line value: {}".format(item.tobytes())
-                )
+        if not (rows["size"] == rows.dtype["values"].itemsize).all():
+            raise AssertionError("# headers does not match # lines")
 
-            yield {h: float(v) for h, v in zip(headers, items.tolist())}
-
-    def _read_item(self, fh):
-        # Fortran writes out a 4 byte integer representing the # of bytes to read for
-        # a given chunk, the data and then the size again
-        d = fh.read(4)
-        if d != b"":
-            s = memoryview(d).cast("i")[0]
-            item = memoryview(fh.read(s))
-            s_after = memoryview(fh.read(4)).cast("i")[0]
-            if not s_after == s:
-                raise AssertionError(
-                    "Wrong size after data. Before: {}. " "After: {}".format(s, s_after)
-                )
+        end_ok = (
+            (rows["end_size"] == 3)
+            & (rows["end"] == b"END")
+            & (rows["end_size_after"] == 3)
+        )
+        if not end_ok.all():
+            raise AssertionError(
+                "Unexpected final line value: {}".format(rows["end"][~end_ok][0])
+            )
 
-            return item
+        values = rows["values"]
+        if columns is not None:
+            # only the selected offsets of each row are read from the file
+            values = values[:, columns]
+
+        # copy into a 2D array of doubles
+        return values.astype(float)
+
+
+def _get_row_dtype(n_values):
+    return np.dtype(
+        [
+            ("size", "i4"),
+            ("values", "f4", (n_values,)),
+            ("size_after", "i4"),
+            ("end_size", "i4"),
+            ("end", "S3"),
+            ("end_size_after", "i4"),
+        ]
+    )
@@ -4,8 +4,8 @@ import numpy as np
 import pandas as pd
 from six import StringIO
 
+from .. import definitions
 from ..definitions import (
-    PART_OF_PRNFILE,
     convert_magicc6_to_magicc7_variables,
     convert_magicc7_to_openscm_variables,
     convert_magicc_to_openscm_regions,
@@ -274,12 +274,12 @@ class _PrnWriter(_Writer):
 
         emms_assert_msg = (
             "Prn files must have, and only have, "
-            "the following species: {}".format(PART_OF_PRNFILE)
+            "the following species: {}".format(definitions.PART_OF_PRNFILE)
         )
-        if not (set(data_block.columns) == set(PART_OF_PRNFILE)):
+        if not (set(data_block.columns) == set(definitions.PART_OF_PRNFILE)):
             raise AssertionError(emms_assert_msg)
 
-        data_block = data_block[PART_OF_PRNFILE]
+        data_block = data_block[definitions.PART_OF_PRNFILE]
 
         data_block.index.name = "Years"
         data_block = self._convert_data_block_to_magicc_time(data_block)
@@ -1,11 +1,11 @@
+import functools
 import warnings
 
 import pandas as pd
 from six import StringIO
 
+from pymagicc import definitions
 from pymagicc.definitions import (
-    PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0,
-    PART_OF_SCENFILE_WITH_EMISSIONS_CODE_1,
     convert_magicc6_to_magicc7_variables,
     convert_magicc7_to_openscm_variables,
     convert_magicc_to_openscm_regions,
@@ -86,9 +86,12 @@ def get_special_scen_code(regions, emissions):
     int
         The special scen code for the regions-emissions combination provided.
     """
-    if sorted(set(PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0)) == sorted(set(emissions)):
+    unique_emissions = sorted(set(emissions))
+    code_0_emissions = definitions.PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0
+    code_1_emissions = definitions.PART_OF_SCENFILE_WITH_EMISSIONS_CODE_1
+    if sorted(set(code_0_emissions)) == unique_emissions:
         scenfile_emissions_code = 0
-    elif sorted(set(PART_OF_SCENFILE_WITH_EMISSIONS_CODE_1)) == sorted(set(emissions)):
+    elif sorted(set(code_1_emissions)) == unique_emissions:
         scenfile_emissions_code = 1
     else:
         msg = "Could not determine scen special code for emissions {}".format(emissions)
@@ -234,22 +237,30 @@ class _ScenReader(_NonStandardEmisInReader):
         return notes
 
 
-class _ScenWriter(_Writer):
-    SCEN_VARS_CODE_0 = convert_magicc7_to_openscm_variables(
-        [v + "_EMIS" for v in PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0]
+@functools.lru_cache()
+def _get_scen_variables(scen_emissions_code):
+    # built on first use so that importing doesn't require building the definitions
+    magicc7_emissions = getattr(
+        definitions,
+        "PART_OF_SCENFILE_WITH_EMISSIONS_CODE_{}".format(scen_emissions_code),
     )
-    SCEN_VARS_CODE_1 = convert_magicc7_to_openscm_variables(
-        [v + "_EMIS" for v in PART_OF_SCENFILE_WITH_EMISSIONS_CODE_1]
+
+    return convert_magicc7_to_openscm_variables(
+        [v + "_EMIS" for v in magicc7_emissions]
     )
 
+
+class _ScenWriter(_Writer):
     def write(self, magicc_input, filepath):
         orig_length = len(magicc_input)
         orig_vars = magicc_input["variable"]
 
-        if not (set(self.SCEN_VARS_CODE_1) - set(orig_vars)):
-            magicc_input.filter(variable=self.SCEN_VARS_CODE_1, inplace=True)
-        elif not (set(self.SCEN_VARS_CODE_0) - set(orig_vars)):
-            magicc_input.filter(variable=self.SCEN_VARS_CODE_0, inplace=True)
+        scen_vars_code_0 = _get_scen_variables(0)
+        scen_vars_code_1 = _get_scen_variables(1)
+        if not (set(scen_vars_code_1) - set(orig_vars)):
+            magicc_input.filter(variable=scen_vars_code_1, inplace=True)
+        elif not (set(scen_vars_code_0) - set(orig_vars)):
+            magicc_input.filter(variable=scen_vars_code_0, inplace=True)
         if len(magicc_input) != orig_length:
             warnings.warn("Ignoring input data which is not required for .SCEN file")
 
@@ -351,9 +362,9 @@ class _ScenWriter(_Writer):
             regions=region_order_magicc, emissions=variables
         )
         if special_scen_code % 10 == 0:
-            variable_order = PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0
+            variable_order = definitions.PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0
         else:
-            variable_order = PART_OF_SCENFILE_WITH_EMISSIONS_CODE_1
+            variable_order = definitions.PART_OF_SCENFILE_WITH_EMISSIONS_CODE_1
 
         for region_db, region_magicc in zip(region_order_db, region_order_magicc):
             region_block_region = convert_magicc_to_openscm_regions(region_db)
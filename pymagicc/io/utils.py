@@ -1,7 +1,7 @@
 from os.path import exists
 
+from pymagicc import definitions
 from pymagicc.definitions import (
-    DATTYPE_REGIONMODE_REGIONS,
     convert_magicc6_to_magicc7_variables,
     convert_magicc7_to_openscm_variables,
     convert_magicc_to_openscm_regions,
@@ -22,9 +22,10 @@ def _get_dattype_regionmode_regions_row(regions, scen7=False):
     def find_region(x):
         return set(x) == regions_unique
 
-    region_rows = DATTYPE_REGIONMODE_REGIONS["regions"].apply(find_region)
+    dattype_regionmode_regions = definitions.DATTYPE_REGIONMODE_REGIONS
+    region_rows = dattype_regionmode_regions["regions"].apply(find_region)
 
-    scen7_rows = DATTYPE_REGIONMODE_REGIONS["thisfile_dattype"] == "SCEN7"
+    scen7_rows = dattype_regionmode_regions["thisfile_dattype"] == "SCEN7"
     dattype_rows = scen7_rows if scen7 else ~scen7_rows
 
     region_dattype_row = region_rows & dattype_rows
@@ -58,7 +59,8 @@ def get_region_order(regions, scen7=False):
         Region order expected by MAGICC for the given region set.
     """
     region_dattype_row = _get_dattype_regionmode_regions_row(regions, scen7=scen7)
-    region_order = DATTYPE_REGIONMODE_REGIONS["regions"][region_dattype_row].iloc[0]
+    dattype_regionmode_regions = definitions.DATTYPE_REGIONMODE_REGIONS
+    region_order = dattype_regionmode_regions["regions"][region_dattype_row].iloc[0]
 
     return region_order
 
@@ -88,10 +90,11 @@ def get_dattype_regionmode(regions, scen7=False):
     """
     region_dattype_row = _get_dattype_regionmode_regions_row(regions, scen7=scen7)
 
-    dattype = DATTYPE_REGIONMODE_REGIONS[DATTYPE_FLAG.lower()][region_dattype_row].iloc[
+    dattype_regionmode_regions = definitions.DATTYPE_REGIONMODE_REGIONS
+    dattype = dattype_regionmode_regions[DATTYPE_FLAG.lower()][region_dattype_row].iloc[
         0
     ]
-    regionmode = DATTYPE_REGIONMODE_REGIONS[REGIONMODE_FLAG.lower()][
+    regionmode = dattype_regionmode_regions[REGIONMODE_FLAG.lower()][
         region_dattype_row
     ].iloc[0]
 
@@ -0,0 +1,458 @@
+"""
+Running many MAGICC runs in parallel.
+
+A single MAGICC copy can only run one MAGICC process at a time. To run large
+ensembles (e.g. many scenarios combined with many parameter sets), we therefore farm
+the runs out to a pool of workers. Each worker creates its own copy of MAGICC the
+first time it is given a job and re-uses that copy for all subsequent jobs. The copy
+is removed again when the worker shuts down.
+
+A single run is described by a :class:`MAGICCJob`. Jobs can be pickled so they can be
+submitted to any :class:`concurrent.futures.Executor` e.g. a thread pool, a process
+pool or an executor which farms work out to a cluster. Workers may be processes or
+threads, each gets its own copy of MAGICC.
+
+:func:`iter_runs` yields the results as each run completes so that large ensembles
+can be processed without holding every result in memory. :func:`run_ensemble` collects
+all the results into a single :obj:`pymagicc.io.MAGICCData`.
+
+Both accept a ``timeout`` so that a single straggling run cannot hold up a whole
+batch. A run which times out is killed, its worker's copy of MAGICC is freed for the
+next job and the failure is recorded in the result's metadata.
+"""
+import itertools
+import os
+import shutil
+import subprocess  # nosec # only used for its exceptions
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.util import Finalize
+
+import numpy as np
+from scmdata import run_append
+
+from .core import _empty_run_output, _get_magicc_class
+
+_worker_state = threading.local()
+"""
+:obj:`threading.local`: state of the current worker, the ``magicc`` attribute holds
+the MAGICC instances owned by the current thread (in the current process)
+"""
+
+
+def _get_worker_magicc(magicc_version, strict):
+    if not hasattr(_worker_state, "magicc"):
+        _worker_state.magicc = {}
+
+    worker_magicc = _worker_state.magicc
+    key = (magicc_version, strict)
+    if key not in worker_magicc:
+        magicc = _get_magicc_class(magicc_version)(strict=strict)
+        magicc.create_copy()
+        # make sure the copy is cleaned up when the worker thread or process exits,
+        # the callback must not hold a reference to the instance otherwise the
+        # instance is never garbage collected when a worker thread exits
+        Finalize(
+            magicc,
+            shutil.rmtree,
+            args=(magicc.root_dir,),
+            kwargs={"ignore_errors": True},
+            exitpriority=10,
+        )
+        worker_magicc[key] = magicc
+
+    return worker_magicc[key]
+
+
+def _split_scenarios(scenarios):
+    if scenarios is None:
+        return [None]
+
+    if isinstance(scenarios, (list, tuple)):
+        return list(scenarios)
+
+    return [s for s in scenarios.groupby("model", "scenario")]
+
+
+def _ensemble_jobs(scenarios, configs):
+    """
+    Get the jobs required to run every combination of ``scenarios`` and ``configs``
+
+    Returns
+    -------
+    list of tuple
+        Each tuple contains the scenario and config for a single run. The jobs follow
+        the order of the combinations, with configs varying fastest.
+    """
+    if configs is None:
+        configs = [{}]
+
+    return list(itertools.product(_split_scenarios(scenarios), configs))
+
+
+def _tag_result(result, run_id, config):
+    result["run_id"] = run_id
+    for k, v in config.items():
+        if isinstance(v, (list, tuple)):
+            # metadata must be hashable and a sequence would otherwise be
+            # interpreted as one value per timeseries
+            values = np.empty(len(result), dtype=object)
+            values[:] = [tuple(v)] * len(result)
+            result[k] = values
+        else:
+            result[k] = v
+
+    return result
+
+
+def _run_job(magicc_version, strict, only, timeout, job):
+    scenario, config = job
+
+    magicc = _get_worker_magicc(magicc_version, strict)
+    # restore the pristine configuration so no state leaks between jobs
+    magicc.set_years()
+    magicc.set_config()
+
+    try:
+        return magicc.run(scenario=scenario, only=only, timeout=timeout, **config)
+    except subprocess.TimeoutExpired as exc:
+        result = _empty_run_output()
+        result.metadata["error"] = str(exc)
+
+        return result
+
+
+class MAGICCJob:
+    """
+    A single MAGICC run which can be submitted to any executor
+
+    Jobs only hold the description of a run, not a MAGICC instance, hence they can
+    be pickled and sent to other processes or machines. When a job is called, it
+    runs on the calling worker's own copy of MAGICC. The copy is created the first
+    time the worker runs a job and re-used for all later jobs with the same
+    ``magicc_version`` and ``strict`` values. Before each run, the copy's years and
+    configuration are reset so no state leaks between jobs.
+
+    .. code:: python
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> from pymagicc import MAGICCJob, rcp26
+        >>> job = MAGICCJob(rcp26, {"core_climatesensitivity": 3})
+        >>> with ThreadPoolExecutor(max_workers=2) as executor:
+        ...     future = job.submit(executor)
+        ...     result = future.result()
+    """
+
+    def __init__(
+        self,
+        scenario=None,
+        config=None,
+        only=None,
+        magicc_version=6,
+        strict=True,
+        timeout=None,
+    ):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        scenario : :obj:`pymagicc.io.MAGICCData`
+            Scenario to run. If ``None``, MAGICC is simply run with its default
+            scenario.
+
+        config : dict
+            Configuration to run with, passed to
+            :meth:`pymagicc.core.MAGICCBase.run` as keyword arguments
+
+        only : list of str
+            If not ``None``, only extract variables in this list
+
+        magicc_version : int
+            MAGICC version to use for the run
+
+        strict : bool
+            Passed to the ``__init__`` method of the worker's MAGICC instance
+
+        timeout : float
+            If not ``None``, the maximum time (in seconds) which the run may take.
+            If the run takes longer, the result is empty and the reason is stored
+            in the result's ``metadata["error"]``.
+
+        Raises
+        ------
+        ValueError
+            If the magicc_version is not available
+        """
+        # fail early rather than in the workers
+        _get_magicc_class(magicc_version)
+
+        self.scenario = scenario
+        self.config = {} if config is None else config
+        self.only = only
+        self.magicc_version = magicc_version
+        self.strict = strict
+        self.timeout = timeout
+
+    def __call__(self):
+        """
+        Run the job on the current worker's copy of MAGICC
+
+        Returns
+        -------
+        :obj:`pymagicc.io.MAGICCData`
+            Output of the run
+        """
+        return _run_job(
+            self.magicc_version,
+            self.strict,
+            self.only,
+            self.timeout,
+            (self.scenario, self.config),
+        )
+
+    def submit(self, executor):
+        """
+        Submit the job to an executor
+
+        Parameters
+        ----------
+        executor : :obj:`concurrent.futures.Executor`
+            Executor to run the job with. Any object with an ``Executor`` compatible
+            ``submit`` method can be used.
+
+        Returns
+        -------
+        :obj:`concurrent.futures.Future`
+            Future which resolves to the output of the run
+        """
+        return executor.submit(self)
+
+
+def iter_runs(
+    jobs,
+    magicc_version=6,
+    n_workers=None,
+    max_in_flight=None,
+    only=None,
+    strict=True,
+    timeout=None,
+    executor=None,
+):
+    """
+    Run jobs in parallel, yielding the results as each run completes
+
+    At most ``max_in_flight`` jobs are submitted to the workers at any one time.
+    Hence, if results are consumed slower than they are produced, at most
+    ``max_in_flight`` results are held in memory and ``jobs`` is only consumed as
+    quickly as results are.
+
+    Parameters
+    ----------
+    jobs : iterable of tuple
+        Jobs to run. Each job is a tuple of the scenario to run (see
+        :meth:`pymagicc.core.MAGICCBase.run`) and a dictionary of configuration to
+        run it with. ``jobs`` may be a generator.
+
+    magicc_version : int
+        MAGICC version to use for the runs
+
+    n_workers : int
+        Number of worker processes to use. If ``None``, the number of CPUs is used.
+        Ignored if ``executor`` is supplied.
+
+    max_in_flight : int
+        Maximum number of jobs which are either running or whose results have not yet
+        been yielded. If ``None``, twice the number of workers (or, if ``executor``
+        is supplied, twice the number of CPUs) is used.
+
+    only : list of str
+        If not ``None``, only extract variables in this list
+
+    strict : bool
+        Passed to the ``__init__`` method of each worker's MAGICC instance
+
+    timeout : float
+        If not ``None``, the maximum time (in seconds) for which each run may take.
+        Runs which take longer are killed and their result is empty, with the reason
+        stored in the result's ``metadata["error"]``.
+
+    executor : :obj:`concurrent.futures.Executor`
+        Executor to run the jobs with (see :class:`MAGICCJob`). If ``None``, a
+        :class:`concurrent.futures.ProcessPoolExecutor` with ``n_workers`` workers is
+        used. A supplied executor is not shut down once the jobs are complete.
+
+    Yields
+    ------
+    tuple
+        The job (exactly as it appears in ``jobs``) and its result as a
+        :obj:`pymagicc.io.MAGICCData`. Results are yielded in the order in which the
+        runs complete, not the order of ``jobs``.
+
+    Raises
+    ------
+    ValueError
+        If the magicc_version is not available
+    """
+    # fail early rather than in the workers
+    _get_magicc_class(magicc_version)
+
+    if executor is not None:
+        if max_in_flight is None:
+            max_in_flight = 2 * os.cpu_count()
+
+        yield from _iter_futures(
+            jobs, executor, max_in_flight, magicc_version, only, strict, timeout
+        )
+        return
+
+    if n_workers is None:
+        n_workers = os.cpu_count()
+
+    if max_in_flight is None:
+        max_in_flight = 2 * n_workers
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        yield from _iter_futures(
+            jobs, executor, max_in_flight, magicc_version, only, strict, timeout
+        )
+
+
+def _iter_futures(jobs, executor, max_in_flight, magicc_version, only, strict, timeout):
+    jobs = iter(jobs)
+    in_flight = {}
+
+    def _submit_jobs():
+        for job in itertools.islice(jobs, max_in_flight - len(in_flight)):
+            scenario, config = job
+            magicc_job = MAGICCJob(
+                scenario,
+                config,
+                only=only,
+                magicc_version=magicc_version,
+                strict=strict,
+                timeout=timeout,
+            )
+            in_flight[magicc_job.submit(executor)] = job
+
+    try:
+        _submit_jobs()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                # only top up once the caller is done with the result so that no
+                # more than ``max_in_flight`` results are held at once
+                yield job, future.result()
+                _submit_jobs()
+    finally:
+        # if the caller stops early or a run fails, don't start any more runs
+        for future in in_flight:
+            future.cancel()
+
+
+def run_ensemble(
+    scenarios,
+    configs=None,
+    magicc_version=6,
+    n_workers=None,
+    only=None,
+    strict=True,
+    timeout=None,
+    executor=None,
+):
+    """
+    Run every combination of scenarios and configurations in parallel
+
+    Each worker process creates (and re-uses) its own copy of MAGICC. Hence
+    throughput scales with the number of workers, up to the number of available
+    cores.
+
+    Parameters
+    ----------
+    scenarios : :obj:`pymagicc.io.MAGICCData` or list of :obj:`pymagicc.io.MAGICCData`
+        Scenarios to run. If a single :obj:`pymagicc.io.MAGICCData` is supplied, each
+        of its model-scenario combinations is run separately. If ``None``, MAGICC is
+        simply run with its default scenario.
+
+    configs : list of dict
+        Configurations to run each scenario with. Each configuration is passed to
+        :meth:`pymagicc.core.MAGICCBase.run` as keyword arguments. If ``None``, each
+        scenario is run once with MAGICC's default configuration.
+
+    magicc_version : int
+        MAGICC version to use for the runs
+
+    n_workers : int
+        Number of worker processes to use. If ``None``, the number of CPUs is used.
+        Ignored if ``executor`` is supplied.
+
+    only : list of str
+        If not ``None``, only extract variables in this list
+
+    strict : bool
+        Passed to the ``__init__`` method of each worker's MAGICC instance
+
+    timeout : float
+        If not ``None``, the maximum time (in seconds) for which each run may take.
+        Runs which take longer are killed and left out of the output.
+
+    executor : :obj:`concurrent.futures.Executor`
+        Executor to run the jobs with (see :func:`iter_runs`)
+
+    Returns
+    -------
+    :obj:`pymagicc.io.MAGICCData`
+        Output of all the runs. Each run is identified by a ``run_id`` column, which
+        enumerates every scenario-config combination (configs varying fastest). Each
+        key in ``configs`` is also added as a column so that runs can be filtered by
+        their configuration. Runs which failed are listed in
+        ``metadata["failures"]``, a dictionary mapping each failed run's ``run_id``
+        to the reason it failed.
+
+    Raises
+    ------
+    ValueError
+        If the magicc_version is not available
+    """
+    # fail early rather than in the workers
+    _get_magicc_class(magicc_version)
+
+    jobs = _ensemble_jobs(scenarios, configs)
+    if not jobs:
+        out = _empty_run_output()
+        out.metadata["failures"] = {}
+
+        return out
+
+    if n_workers is None:
+        n_workers = os.cpu_count()
+
+    n_workers = min(n_workers, len(jobs))
+
+    # results arrive in the order the runs complete so we use each job's position
+    # to put the output in a deterministic order
+    run_ids = {id(job): run_id for run_id, job in enumerate(jobs)}
+    results = [None] * len(jobs)
+    failures = {}
+    for job, result in iter_runs(
+        jobs,
+        magicc_version=magicc_version,
+        n_workers=n_workers,
+        only=only,
+        strict=strict,
+        timeout=timeout,
+        executor=executor,
+    ):
+        run_id = run_ids[id(job)]
+        if "error" in result.metadata:
+            failures[run_id] = result.metadata["error"]
+            continue
+
+        results[run_id] = _tag_result(result, run_id, job[1])
+
+    results = [r for r in results if r is not None]
+    out = run_append(results) if results else _empty_run_output()
+    out.metadata["failures"] = failures
+
+    return out
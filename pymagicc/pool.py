@@ -0,0 +1,242 @@
+"""
+A pool of ready-to-use MAGICC copies.
+
+Creating a copy of MAGICC (see :meth:`pymagicc.core.MAGICCBase.create_copy`) copies
+the binary and all of MAGICC's input files. For short runs, this copy can take longer
+than running MAGICC itself. A :class:`MAGICCPool` keeps a number of copies ready to
+use. After each use, a copy is reset to its pristine state in the background and then
+handed out again.
+
+:func:`pymagicc.run` uses a pool if the ``POOL_SIZE`` config value (see
+:mod:`pymagicc.config`) is greater than zero.
+"""
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from .config import config
+from .core import _get_magicc_class
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class MAGICCPool:
+    """
+    Pool of ready-to-use MAGICC instances
+
+    Instances are created with :meth:`pymagicc.core.MAGICCBase.create_copy` so they
+    are already configured to work with Pymagicc. When an instance is returned to the
+    pool, its run directory is reset to the state it was in straight after being
+    created, hence no configuration leaks from one use to the next.
+    """
+
+    def __init__(self, magicc_version=6, size=2):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        magicc_version : int
+            MAGICC version to use
+
+        size : int
+            Number of MAGICC copies to keep. If more copies are in use at once, extra
+            copies are created and removed again once they are returned.
+
+        Raises
+        ------
+        ValueError
+            If the magicc_version is not available
+        """
+        self.magicc_cls = _get_magicc_class(magicc_version)
+        self.size = size
+        self._ready = []
+        self._lock = threading.Lock()
+        # all instances owned by the pool (ready, in use or being created/reset)
+        self._n_instances = 0
+        self._background = ThreadPoolExecutor(max_workers=1)
+        self._closed = False
+
+    def _create_instance(self):
+        magicc = self.magicc_cls()
+        magicc.create_copy()
+        magicc._record_pristine_state()
+
+        return magicc
+
+    def _discard(self, magicc):
+        with self._lock:
+            self._n_instances -= 1
+
+        magicc.remove_temp_copy()
+
+    def _add_ready(self, magicc):
+        with self._lock:
+            if not self._closed and self._n_instances <= self.size:
+                self._ready.append(magicc)
+                return
+
+        self._discard(magicc)
+
+    def _fill(self):
+        try:
+            magicc = self._create_instance()
+        except Exception:
+            # the error will be raised again when an instance is created on demand
+            with self._lock:
+                self._n_instances -= 1
+
+            raise
+
+        self._add_ready(magicc)
+
+    def _reset(self, magicc):
+        try:
+            magicc._reset_to_pristine_state()
+        except Exception:
+            # a broken copy is simply dropped, it will be replaced by the next fill
+            self._discard(magicc)
+            return
+
+        self._add_ready(magicc)
+
+    def _schedule_fill(self):
+        # must be called with self._lock held
+        while self._n_instances < self.size:
+            self._n_instances += 1
+            self._background.submit(self._fill)
+
+    def acquire(self):
+        """
+        Get a MAGICC instance from the pool
+
+        If no instance is ready, a new one is created. The pool is refilled in the
+        background.
+
+        Returns
+        -------
+        :obj:`pymagicc.core.MAGICCBase`
+            MAGICC instance which is ready to run
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("Pool has been closed")
+
+            if self._ready:
+                magicc = self._ready.pop()
+            else:
+                magicc = None
+                self._n_instances += 1
+
+            self._schedule_fill()
+
+        if magicc is None:
+            try:
+                magicc = self._create_instance()
+            except Exception:
+                with self._lock:
+                    self._n_instances -= 1
+
+                raise
+
+        return magicc
+
+    def release(self, magicc):
+        """
+        Return a MAGICC instance to the pool
+
+        The instance is reset in the background before it is available again.
+
+        Parameters
+        ----------
+        magicc : :obj:`pymagicc.core.MAGICCBase`
+            Instance to return. It must have been retrieved with :meth:`acquire`.
+        """
+        with self._lock:
+            if not self._closed:
+                self._background.submit(self._reset, magicc)
+                return
+
+        self._discard(magicc)
+
+    @contextmanager
+    def magicc(self):
+        """
+        Context manager which acquires an instance and releases it on exit
+
+        Yields
+        ------
+        :obj:`pymagicc.core.MAGICCBase`
+            MAGICC instance which is ready to run
+        """
+        magicc = self.acquire()
+        try:
+            yield magicc
+        finally:
+            self.release(magicc)
+
+    def close(self):
+        """
+        Remove all the MAGICC copies held by the pool
+        """
+        with self._lock:
+            self._closed = True
+
+        # wait for any background work to finish
+        self._background.shutdown(wait=True)
+
+        with self._lock:
+            ready = self._ready
+            self._ready = []
+
+        for magicc in ready:
+            magicc.remove_temp_copy()
+
+
+def get_pool(magicc_version=6, size=None):
+    """
+    Get the module level pool for a given MAGICC version
+
+    Parameters
+    ----------
+    magicc_version : int
+        MAGICC version
+
+    size : int
+        Number of ready instances to keep. If ``None``, the ``POOL_SIZE`` config value
+        is used.
+
+    Returns
+    -------
+    :obj:`MAGICCPool`
+        Pool of MAGICC instances. Pools are specific to the executable being used so
+        changing the executable results in a new pool.
+    """
+    if size is None:
+        size = int(config["pool_size"])
+
+    magicc_cls = _get_magicc_class(magicc_version)
+    key = (magicc_version, magicc_cls().executable)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = MAGICCPool(magicc_version, size=size)
+
+        pool = _pools[key]
+        pool.size = size
+
+    return pool
+
+
+@atexit.register
+def close_pools():
+    """
+    Close all the module level pools, removing their MAGICC copies
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close()
@@ -1,3 +1,12 @@
+"""
+Scenarios which are shipped with Pymagicc.
+
+The scenarios (``rcp26``, ``rcp45``, ``rcp60``, ``rcp85``, ``rcps`` and
+``zero_emissions``) are only read from disk the first time they are accessed, hence
+importing Pymagicc doesn't require parsing every scenario file. Once read, each
+scenario is kept so later accesses are free.
+"""
+import sys
 from copy import deepcopy
 from os.path import abspath, dirname, join
 
@@ -43,34 +52,63 @@ def read_scen_file(
     return mdata
 
 
-rcp26 = read_scen_file(
-    join(_magicc6_included_distribution_path, "RCP26.SCEN"),
-    columns={"model": ["IMAGE"], "scenario": ["RCP26"]},
-)
-rcp45 = read_scen_file(
-    join(_magicc6_included_distribution_path, "RCP45.SCEN"),
-    columns={"model": ["MiniCAM"], "scenario": ["RCP45"]},
-)
-rcp60 = read_scen_file(
-    join(_magicc6_included_distribution_path, "RCP60.SCEN"),
-    columns={"model": ["AIM"], "scenario": ["RCP60"]},
-)
-rcp85 = read_scen_file(
-    join(_magicc6_included_distribution_path, "RCP85.SCEN"),
-    columns={"model": ["MESSAGE"], "scenario": ["RCP85"]},
-)
-
-rcps = deepcopy(rcp26)
-for rcp in [rcp45, rcp60, rcp85]:
-    rcps = rcps.append(rcp)
-
-zero_emissions = MAGICCData(
-    join(dirname(abspath(__file__)), "RCP3PD_EMISSIONS.DAT"),
-    columns={
-        "scenario": ["idealised"],
-        "model": ["unspecified"],
-        "climate_model": ["unspecified"],
-    },
-).filter(region="World")
+def _read_rcp(filename, model, scenario):
+    return read_scen_file(
+        join(_magicc6_included_distribution_path, filename),
+        columns={"model": [model], "scenario": [scenario]},
+    )
+
+
+def _load_rcps():
+    # go through the module so that any RCPs which are already loaded are reused
+    module = sys.modules[__name__]
+    rcps = deepcopy(module.rcp26)
+    for rcp in ["rcp45", "rcp60", "rcp85"]:
+        rcps = rcps.append(getattr(module, rcp))
+
+    return rcps
+
+
+def _load_zero_emissions():
+    zero_emissions = MAGICCData(
+        join(dirname(abspath(__file__)), "RCP3PD_EMISSIONS.DAT"),
+        columns={
+            "scenario": ["idealised"],
+            "model": ["unspecified"],
+            "climate_model": ["unspecified"],
+        },
+    ).filter(region="World")
+
+    return zero_emissions * 0.0
+
+
+_SCENARIO_LOADERS = {
+    "rcp26": lambda: _read_rcp("RCP26.SCEN", "IMAGE", "RCP26"),
+    "rcp45": lambda: _read_rcp("RCP45.SCEN", "MiniCAM", "RCP45"),
+    "rcp60": lambda: _read_rcp("RCP60.SCEN", "AIM", "RCP60"),
+    "rcp85": lambda: _read_rcp("RCP85.SCEN", "MESSAGE", "RCP85"),
+    "rcps": _load_rcps,
+    "zero_emissions": _load_zero_emissions,
+}
+"""dict: Functions which load each of the scenarios shipped with Pymagicc"""
+
+
+def __getattr__(name):
+    # only called if ``name`` isn't already a module attribute i.e. each scenario is
+    # only loaded once, after that it is found in the module's globals
+    if name not in _SCENARIO_LOADERS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    globals()[name] = _SCENARIO_LOADERS[name]()
+
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SCENARIO_LOADERS))
+
 
-zero_emissions = zero_emissions * 0.0
+if sys.version_info < (3, 7):  # pragma: no cover
+    # module level __getattr__ is not supported so load everything up front
+    for _name in _SCENARIO_LOADERS:
+        __getattr__(_name)
@@ -56,7 +56,7 @@ def create_package(MAGICC_cls, **kwargs):
         env_help = "If you set MAGICC_EXECUTABLE_X=/path/to/MAGICCX/binary then you will be able to run the tests with that binary for MAGICC_X."
         pytest.skip("\n".join([magicc_x_unavailable, env_text, env_help]))
 
-    if p.version == 6 and (not _wine_installed) and (not _is_windows):
+    if p.version == 6 and (not _wine_installed()) and (not _is_windows):
         pytest.xfail("Wine is not installed")
 
     p.create_copy()
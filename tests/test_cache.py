@@ -0,0 +1,61 @@
+from os import listdir, utime
+from os.path import getsize, join
+
+from pymagicc import rcp26, rcp85
+from pymagicc.cache import ResultCache, get_result_cache, hash_file
+
+
+def test_hash_file(temp_dir):
+    filepath = join(temp_dir, "file.txt")
+    with open(filepath, "w") as fh:
+        fh.write("hello")
+
+    first = hash_file(filepath)
+    assert hash_file(filepath) == first
+
+    with open(filepath, "w") as fh:
+        fh.write("hello world")
+
+    assert hash_file(filepath) != first
+
+
+def test_get_result_cache(config_override, temp_dir):
+    assert get_result_cache() is None
+
+    config_override("CACHE_DIR", temp_dir)
+    config_override("CACHE_MAX_SIZE", "1000")
+    cache = get_result_cache()
+
+    assert cache.cache_dir == temp_dir
+    assert cache.max_size == 1000
+
+
+def test_result_cache(temp_dir):
+    cache = ResultCache(join(temp_dir, "cache"))
+
+    assert cache.get("key") is None
+
+    cache.set("key", rcp26)
+    res = cache.get("key")
+
+    assert res is not rcp26
+    assert res.metadata == rcp26.metadata
+    assert res.timeseries().equals(rcp26.timeseries())
+
+    cache.clear()
+    assert cache.get("key") is None
+
+
+def test_result_cache_eviction(temp_dir):
+    cache = ResultCache(temp_dir)
+    cache.set("a", rcp26)
+    cache.max_size = 2.5 * getsize(join(temp_dir, "a.pkl"))
+
+    cache.set("b", rcp85)
+    # make sure "a" is the least recently used result
+    utime(join(temp_dir, "a.pkl"), ns=(0, 0))
+    cache.get("b")
+    cache.set("c", rcp26)
+
+    assert sorted(listdir(temp_dir)) == ["b.pkl", "c.pkl"]
+    assert cache.get("a") is None
@@ -1,5 +1,8 @@
+from unittest.mock import patch
+
 from pymagicc.config import (
     ConfigStore,
+    _wine_installed,
     config,
     default_config,
     lookup_defaults,
@@ -47,3 +50,26 @@ def test_overrides():
 
     c["executable_6"] = "testing"
     assert c["EXECUTABLE_6"] == "testing"
+
+
+@patch("pymagicc.config.shutil.which")
+def test_wine_installed(mock_which):
+    _wine_installed.cache_clear()
+    try:
+        mock_which.return_value = "/usr/bin/wine"
+        assert _wine_installed()
+        assert _wine_installed()
+
+        mock_which.assert_called_once_with("wine")
+    finally:
+        _wine_installed.cache_clear()
+
+
+@patch("pymagicc.config.shutil.which")
+def test_wine_not_installed(mock_which):
+    _wine_installed.cache_clear()
+    try:
+        mock_which.return_value = None
+        assert not _wine_installed()
+    finally:
+        _wine_installed.cache_clear()
@@ -1,9 +1,16 @@
+import asyncio
 import copy
+import logging
+import os
 import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from os import listdir, remove
-from os.path import exists, join
-from subprocess import CalledProcessError
+from os import listdir, makedirs, remove, stat
+from os.path import basename, dirname, exists, getsize, join
+from subprocess import CalledProcessError, TimeoutExpired
+from tempfile import gettempdir
 from unittest.mock import patch
 
 import f90nml
@@ -12,11 +19,11 @@ import pandas as pd
 import pytest
 from openscm_units import unit_registry
 
-from pymagicc import MAGICC6, MAGICC7, zero_emissions
-from pymagicc.core import MAGICCBase, _clean_value, config
+from pymagicc import MAGICC6, MAGICC7, rcp26, zero_emissions
+from pymagicc.core import IS_WINDOWS, MAGICCBase, _clean_value, config
 from pymagicc.io import MAGICCData, read_cfg_file
 
-from .test_io import MAGICC6_DIR
+from .test_io import MAGICC6_DIR, TEST_OUT_DIR
 
 
 @pytest.fixture(scope="function")
@@ -65,6 +72,112 @@ def test_run_failure(package):
     assert package.config is None
 
 
+def _run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_arun_failure(package):
+    if exists(join(package.run_dir, "HISTRCP_CO2I_EMIS.IN")):
+        remove(join(package.run_dir, "HISTRCP_CO2I_EMIS.IN"))
+
+    if exists(join(package.run_dir, "HISTSSP_CO2I_EMIS.IN")):
+        remove(join(package.run_dir, "HISTSSP_CO2I_EMIS.IN"))
+
+    with pytest.raises(CalledProcessError):
+        _run_async(package.arun())
+
+    assert package.config is None
+
+
+def test_arun_matches_run(package):
+    res = package.run(only=["Surface Temperature"])
+    res_async = _run_async(package.arun(only=["Surface Temperature"]))
+
+    pd.testing.assert_frame_equal(res.timeseries(), res_async.timeseries())
+
+
+def test_arun_concurrent(package):
+    async def run_both(m1, m2):
+        return await asyncio.gather(
+            m1.arun(core_climatesensitivity=2, only=["Surface Temperature"]),
+            m2.arun(core_climatesensitivity=4, only=["Surface Temperature"]),
+        )
+
+    with type(package)() as other:
+        low, high = _run_async(run_both(package, other))
+
+    low_2100 = low.filter(region="World", year=2100).values.squeeze()
+    high_2100 = high.filter(region="World", year=2100).values.squeeze()
+    assert high_2100 > low_2100
+
+
+@pytest.fixture
+def slow_magicc7(temp_dir, config_override):
+    if IS_WINDOWS:
+        pytest.skip("fake MAGICC is a shell script")
+
+    for sub_dir in ["bin", "run", "out"]:
+        makedirs(join(temp_dir, sub_dir))
+
+    # writes some partial output then starts a child process which outlives any
+    # reasonable timeout
+    executable = join(temp_dir, "bin", "magicc")
+    with open(executable, "w") as fh:
+        fh.write(
+            "#!/bin/sh\n"
+            "echo partial > ../out/DAT_SURFACE_TEMP.OUT\n"
+            "sleep 30 &\n"
+            "echo $! > ../child.pid\n"
+            "wait\n"
+        )
+    os.chmod(executable, 0o755)
+
+    with open(join(temp_dir, "run", "MAGCFG_USER.CFG"), "w") as fh:
+        fh.write("&nml_allcfgs\n file_tuningmodel_1 = 'PYMAGICC'\n/\n")
+
+    config_override("EXECUTABLE_7", executable)
+
+    yield MAGICC7(root_dir=temp_dir)
+
+
+def _process_alive(pid):
+    try:
+        with open("/proc/{}/stat".format(pid)) as fh:
+            # zombies have been killed, they are just waiting to be reaped
+            return fh.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _check_timed_out(magicc, start):
+    assert time.perf_counter() - start < 10
+    assert listdir(magicc.out_dir) == []
+
+    with open(join(magicc.root_dir, "child.pid")) as fh:
+        child_pid = int(fh.read())
+    assert not _process_alive(child_pid)
+
+
+def test_run_timeout(slow_magicc7):
+    start = time.perf_counter()
+    with pytest.raises(TimeoutExpired):
+        slow_magicc7.run(timeout=0.5)
+
+    _check_timed_out(slow_magicc7, start)
+
+
+def test_arun_timeout(slow_magicc7):
+    start = time.perf_counter()
+    with pytest.raises(TimeoutExpired):
+        _run_async(slow_magicc7.arun(timeout=0.5))
+
+    _check_timed_out(slow_magicc7, start)
+
+
 @pytest.mark.parametrize("tonly", (["junk"], ["junk", "junkier"]))
 def test_run_no_output(package, tonly):
     error_msg = re.escape("No output found for only={}".format(tonly))
@@ -307,6 +420,224 @@ def test_run_only(package):
     assert "Surface Temperature" in results["variable"].values
 
 
+def test_run_only_limits_output(package):
+    write_config(package)
+    package.update_config(out_forcing=1)
+    tune_file = join(package.run_dir, "MAGTUNE_PYMAGICC.CFG")
+    expected_tune = f90nml.read(tune_file)["nml_allcfgs"]
+
+    results = package.run(only=["Surface Temperature"])
+
+    assert results["variable"].unique().tolist() == ["Surface Temperature"]
+    assert not [f for f in listdir(package.out_dir) if "_RF." in f]
+
+    tune = f90nml.read(tune_file)["nml_allcfgs"]
+    tune.pop("rundate")
+    expected_tune.pop("rundate", None)
+    assert tune == expected_tune
+
+
+@pytest.mark.parametrize(
+    "magicc_cls,expected",
+    [
+        (
+            MAGICC6,
+            {
+                "out_temperature": 1,
+                "out_emissions": 1,
+                "out_forcing": 0,
+                "out_ascii_binary": "ASCII",
+            },
+        ),
+        (
+            MAGICC7,
+            {
+                "out_temperature": 0,
+                "out_emissions": 0,
+                "out_forcing": 0,
+                "out_ascii_binary": "BINARY",
+                "out_binary_format": 2,
+                "out_dynamic_vars": ["DAT_SURFACE_TEMP", "DAT_CO2I_EMIS"],
+            },
+        ),
+    ],
+)
+def test_get_output_config_for_variables(magicc_cls, expected):
+    res = magicc_cls()._get_output_config_for_variables(
+        ["Surface Temperature", "Emissions|CO2|MAGICC Fossil and Industrial"]
+    )
+
+    for k, v in expected.items():
+        assert res[k] == v
+
+    assert "out_parameters" not in res
+    assert "out_warnings" not in res
+
+
+@pytest.mark.parametrize("magicc_cls", [MAGICC6, MAGICC7])
+@pytest.mark.parametrize(
+    "variables", [["Surface Temperature", "junk"], ["HEATUPTAKE_EBALANCE_TOTAL"]]
+)
+def test_get_output_config_for_variables_unknown(magicc_cls, variables):
+    assert magicc_cls()._get_output_config_for_variables(variables) is None
+
+
+@pytest.mark.parametrize("parse_workers", [2, "process_pool"])
+def test_read_run_output_parse_workers(temp_dir, parse_workers):
+    out_dir = join(temp_dir, "out")
+    makedirs(out_dir)
+    for filename in [
+        "DAT_SURFACE_TEMP.OUT",
+        "DAT_CO2_CONC.OUT",
+        "DAT_CO2I_EMIS.OUT",
+        "DAT_TOTAL_INCLVOLCANIC_RF.BINOUT",
+        "DAT_CH4_RF.BINOUT",
+        "CARBONCYCLE.OUT",
+    ]:
+        shutil.copy(join(TEST_OUT_DIR, filename), out_dir)
+
+    magicc = MAGICC7(root_dir=temp_dir)
+    expected = magicc._read_run_output(None, None, b"")
+
+    if parse_workers == "process_pool":
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            res = magicc._read_run_output(None, None, b"", parse_workers=executor)
+    else:
+        res = magicc._read_run_output(None, None, b"", parse_workers=parse_workers)
+
+    assert len(res["variable"].unique()) == 5
+    pd.testing.assert_frame_equal(res.timeseries(), expected.timeseries())
+
+
+@pytest.fixture
+def subannual_out_magicc7(temp_dir):
+    out_dir = join(temp_dir, "out")
+    makedirs(out_dir)
+    for filename in [
+        "DAT_SURFACE_TEMP.BINOUT",
+        "DAT_SURFACE_TEMP_SUBANNUAL.BINOUT",
+        "DAT_VOLCANIC_RF.BINOUT",
+        "DAT_VOLCANIC_ANNUAL_RF.BINOUT",
+    ]:
+        shutil.copy(join(TEST_OUT_DIR, filename), out_dir)
+
+    yield MAGICC7(root_dir=temp_dir)
+
+
+def test_read_run_output_skips_subannual(subannual_out_magicc7):
+    with pytest.warns(UserWarning, match="Not reading file: DAT_VOLCANIC_RF.BINOUT"):
+        res = subannual_out_magicc7._read_run_output(None, None, b"")
+
+    assert "subannual" not in res.metadata
+    assert {t.month for t in res["time"]} == {1}
+
+
+def test_read_run_output_subannual(subannual_out_magicc7):
+    res = subannual_out_magicc7._read_run_output(None, None, b"", subannual=True)
+
+    assert sorted(res["variable"].unique()) == [
+        "Radiative Forcing|Volcanic",
+        "Surface Temperature",
+    ]
+    subannual = res.metadata["subannual"]
+    assert sorted(subannual["variable"].unique()) == [
+        "Radiative Forcing|Volcanic",
+        "Surface Temperature",
+    ]
+    temp = subannual.filter(variable="Surface Temperature")
+    expected = MAGICCData(join(TEST_OUT_DIR, "DAT_SURFACE_TEMP_SUBANNUAL.OUT"))
+    assert len(temp["time"]) == len(expected["time"])
+    assert len(temp.filter(year=2000)["time"]) == 12
+
+
+def test_read_run_output_subannual_only(subannual_out_magicc7):
+    res = subannual_out_magicc7._read_run_output(
+        None, ["Radiative Forcing|Volcanic"], b"", subannual=True
+    )
+
+    assert res.get_unique_meta("variable", True) == "Radiative Forcing|Volcanic"
+    subannual = res.metadata["subannual"]
+    assert subannual.get_unique_meta("variable", True) == "Radiative Forcing|Volcanic"
+
+
+def test_run_uses_cache(package, config_override, temp_dir):
+    config_override("CACHE_DIR", temp_dir)
+    write_config(package)
+
+    res = package.run(rcp26, only=["Surface Temperature"], core_climatesensitivity=3)
+    package.config = None
+
+    with patch.object(
+        package, "_run_magicc", wraps=package._run_magicc
+    ) as mock_run_magicc:
+        cached = package.run(
+            rcp26, only=["Surface Temperature"], core_climatesensitivity=3
+        )
+
+        assert cached.timeseries().equals(res.timeseries())
+        assert package.config is not None
+        mock_run_magicc.assert_not_called()
+
+        package.run(rcp26, only=["Surface Temperature"], core_climatesensitivity=4)
+        mock_run_magicc.assert_called_once()
+
+
+def test_run_timings(package, caplog):
+    write_config(package)
+    with caplog.at_level(logging.DEBUG, logger="pymagicc.core"):
+        res = package.run(rcp26, only=["Surface Temperature"])
+
+    timings = res.metadata["timings"]
+    for phase in ["write_scenario", "set_config", "write_config", "magicc", "total"]:
+        assert timings[phase] > 0
+
+    assert timings["files_read"] >= 1
+    assert timings["bytes_read"] > 0
+    assert timings["total"] > timings["magicc"]
+    assert "run timings" in caplog.text
+
+
+def test_run_timings_reset_after_failure(package):
+    write_config(package)
+    error = CalledProcessError(1, "magicc")
+    with patch.object(package, "_run_magicc", side_effect=error):
+        with pytest.raises(CalledProcessError):
+            package.run(rcp26)
+
+    assert package._timings is None
+
+    # later runs record their own timings only
+    res = package.run(rcp26, only=["Surface Temperature"])
+    assert res.metadata["timings"]["magicc"] > 0
+    assert package._timings is None
+
+
+def test_read_run_output_timings(temp_dir):
+    out_dir = join(temp_dir, "out")
+    makedirs(out_dir)
+    for filename in ["DAT_SURFACE_TEMP.OUT", "DAT_CO2_CONC.OUT", "CARBONCYCLE.OUT"]:
+        shutil.copy(join(TEST_OUT_DIR, filename), out_dir)
+
+    magicc = MAGICC7(root_dir=temp_dir)
+    # nothing is recorded outside of a run
+    magicc._read_run_output(None, None, b"")
+    assert magicc._timings is None
+
+    start = magicc._start_timings()
+    res = magicc._finish_timings(magicc._read_run_output(None, None, b""), start)
+
+    timings = res.metadata["timings"]
+    assert timings["files_read"] == 2
+    assert timings["bytes_read"] == sum(
+        [
+            getsize(join(out_dir, f))
+            for f in ["DAT_SURFACE_TEMP.OUT", "DAT_CO2_CONC.OUT"]
+        ]
+    )
+    assert timings["total"] >= timings["read_output"] + timings["run_append"]
+    assert magicc._timings is None
+
+
 def test_run_rewritten_scen_file(package, temp_dir):
     starting_scen = join(MAGICC6_DIR, "RCP26.SCEN")
     written_scen = join(package.run_dir, "RCP26.SCEN7")
@@ -323,6 +654,37 @@ def test_run_rewritten_scen_file(package, temp_dir):
     assert "Surface Temperature" in results["variable"].values
 
 
+def test_set_emission_scenario_setup_skips_unchanged(package):
+    with patch.object(package, "write", wraps=package.write) as mock_write:
+        package.set_emission_scenario_setup(rcp26, {})
+        package.set_emission_scenario_setup(rcp26.copy(), {})
+        assert mock_write.call_count == 1
+
+        changed = rcp26.copy()
+        changed.metadata["notes"] = "changed"
+        package.set_emission_scenario_setup(changed, {})
+        assert mock_write.call_count == 2
+
+        changed = rcp26.filter(year=range(1765, 2100))
+        package.set_emission_scenario_setup(changed, {})
+        assert mock_write.call_count == 3
+
+    # the file on disk is checked too
+    remove(join(package.run_dir, package._scen_file_name))
+    package.set_emission_scenario_setup(changed, {})
+    assert exists(join(package.run_dir, package._scen_file_name))
+
+
+def test_set_emission_scenario_setup_after_write(package):
+    package.set_emission_scenario_setup(rcp26, {})
+    package.write(rcp26.filter(year=range(1765, 2100)), package._scen_file_name)
+
+    with patch.object(package, "write", wraps=package.write) as mock_write:
+        package.set_emission_scenario_setup(rcp26, {})
+
+    mock_write.assert_called_once()
+
+
 def test_override_config():
     config["EXECUTABLE_6"] = "/tmp/magicc"
     magicc = MAGICC6()
@@ -939,6 +1301,37 @@ def test_updates_namelist_missing(package):
     assert "test_value" in updated_conf["nml_allcfgs"]
 
 
+def test_updates_namelist_altered_on_disk(package):
+    package.set_config("MAGTUNE_SIMPLE.CFG", test_value=1.2)
+
+    fname = join(package.run_dir, "MAGTUNE_SIMPLE.CFG")
+    f90nml.write({"nml_allcfgs": {"other_value": 3, "longer": 1}}, fname, force=True)
+
+    package.update_config("MAGTUNE_SIMPLE.CFG", test_value=2.3)
+
+    updated_conf = f90nml.read(fname)
+    assert updated_conf["nml_allcfgs"] == {
+        "other_value": 3,
+        "longer": 1,
+        "test_value": 2.3,
+    }
+
+
+def test_prepare_run_writes_config_once(package):
+    with patch("pymagicc.core.f90nml.write", wraps=f90nml.write) as mock_write:
+        package._prepare_run(
+            None, False, {"startyear": 1800, "core_climatesensitivity": 4}
+        )
+
+    written = sorted([basename(c[0][1]) for c in mock_write.call_args_list])
+    assert written == ["MAGCFG_NMLYEARS.CFG", "MAGTUNE_PYMAGICC.CFG"]
+
+    years = f90nml.read(join(package.run_dir, "MAGCFG_NMLYEARS.CFG"))
+    assert years["nml_years"]["startyear"] == 1800
+    tune = f90nml.read(join(package.run_dir, "MAGTUNE_PYMAGICC.CFG"))
+    assert tune["nml_allcfgs"]["core_climatesensitivity"] == 4
+
+
 def test_update_config_conflicting_keys_error(package):
     error_msg = re.escape(
         "The following configuration keys clash because configs are case "
@@ -957,6 +1350,17 @@ def test_set_config_conflicting_keys_error(package):
         package.set_config(core_climatesensitivity=3, CORE_CLIMATESENSITIVITY=2)
 
 
+@pytest.mark.parametrize("method", ["set_config", "update_config"])
+def test_config_result_is_a_copy(package, method):
+    res = getattr(package, method)(core_climatesensitivity=3)
+    res["nml_allcfgs"]["core_climatesensitivity"] = 5
+
+    held = package._read_namelist("MAGTUNE_PYMAGICC.CFG", "nml_allcfgs")
+    assert held["nml_allcfgs"]["core_climatesensitivity"] == 3
+    raw_conf = f90nml.read(join(package.run_dir, "MAGTUNE_PYMAGICC.CFG"))
+    assert raw_conf["nml_allcfgs"]["core_climatesensitivity"] == 3
+
+
 def test_ascii_output(package):
     fname = join(package.run_dir, "MAGTUNE_PYMAGICC.CFG")
 
@@ -1512,6 +1916,12 @@ def test_out_forcing(package):
     volc = res.filter(variable="Radiative Forcing|Volcanic")
     assert (volc["time"][1] - volc["time"][0]).days == 365
 
+    res_subannual = package.run(subannual=True, **run_kwargs)
+    volc_monthly = res_subannual.metadata["subannual"].filter(
+        variable="Radiative Forcing|Volcanic"
+    )
+    assert (volc_monthly["time"][1] - volc_monthly["time"][0]).days == 30
+
     # make sure annual series also read sensibly
     if package.version == 6:
         exp = 289.2
@@ -1606,16 +2016,14 @@ def test_stderr_accessible_on_failure(package):
 )
 def test_stderr_warning_raises_warning(mocker, level, raises):
 
-    # Run magicc, but replaces the error message
-    def run(*args, **kwargs):
-        import subprocess
+    run_magicc = MAGICCBase._run_magicc
 
-        r = subprocess.run(*args, **kwargs)
-        r.stderr = level.encode("ascii")
-        return r
+    # Run magicc, but replaces the error message
+    def run(self, *args, **kwargs):
+        run_magicc(self, *args, **kwargs)
+        return level.encode("ascii")
 
-    mock_run = mocker.patch("pymagicc.core.subprocess").run
-    mock_run.side_effect = run
+    mocker.patch.object(MAGICCBase, "_run_magicc", run)
 
     try:
         with MAGICC7() as m:
@@ -1668,3 +2076,90 @@ def test_failure_message(package, capsys):
         package.run()
 
     assert "stderr:\n" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("copy_strategy", ["copy", "hardlink", "reflink"])
+def test_copy_strategy(copy_strategy):
+    magicc = MAGICC6(copy_strategy=copy_strategy)
+    try:
+        magicc.create_copy()
+
+        original_file = join(MAGICC6_DIR, "MAGCFG_DEFAULTALL_69.CFG")
+        copied_file = join(magicc.run_dir, "MAGCFG_DEFAULTALL_69.CFG")
+        with open(original_file) as fh:
+            original_contents = fh.read()
+        with open(copied_file) as fh:
+            assert fh.read() == original_contents
+
+        if copy_strategy == "hardlink":
+            assert stat(copied_file).st_ino == stat(original_file).st_ino
+        else:
+            assert stat(copied_file).st_ino != stat(original_file).st_ino
+
+        for written_file in magicc._written_files:
+            written_file = join(magicc.run_dir, written_file)
+            if exists(written_file):
+                assert stat(written_file).st_nlink == 1
+
+        # writing via the instance must never alter the original distribution
+        magicc.update_config("MAGCFG_DEFAULTALL_69.CFG", core_climatesensitivity=5)
+        with open(original_file) as fh:
+            assert fh.read() == original_contents
+        with open(copied_file) as fh:
+            assert fh.read() != original_contents
+    finally:
+        magicc.remove_temp_copy()
+
+
+def test_copy_strategy_invalid():
+    error_msg = re.escape(
+        "`copy_strategy` must be one of: ['copy', 'hardlink', 'reflink']"
+    )
+    with pytest.raises(ValueError, match=error_msg):
+        MAGICC6(copy_strategy="junk")
+
+
+@patch("pymagicc.core.link")
+def test_copy_strategy_hardlink_fallback(mock_link):
+    mock_link.side_effect = OSError("Invalid cross-device link")
+
+    with MAGICC6(copy_strategy="hardlink") as magicc:
+        copied_file = join(magicc.run_dir, "HISTRCP_CO2I_EMIS.IN")
+        assert exists(copied_file)
+        assert stat(copied_file).st_nlink == 1
+
+    mock_link.assert_called()
+
+
+def test_tmp_dir(temp_dir):
+    with MAGICC6(tmp_dir=temp_dir) as magicc:
+        assert dirname(magicc.root_dir) == temp_dir
+        assert exists(join(magicc.run_dir, "MAGTUNE_PYMAGICC.CFG"))
+
+
+def test_tmp_dir_config(temp_dir, config_override):
+    config_override("TMPDIR", temp_dir)
+
+    with MAGICC6() as magicc:
+        assert dirname(magicc.root_dir) == temp_dir
+
+
+def test_tmp_dir_missing(temp_dir):
+    tmp_dir = join(temp_dir, "junk")
+    error_msg = re.escape("Cannot write to {}".format(tmp_dir))
+    with pytest.warns(UserWarning, match=error_msg):
+        with MAGICC6(tmp_dir=tmp_dir) as magicc:
+            assert dirname(magicc.root_dir) == gettempdir()
+
+
+@patch("pymagicc.core.shutil.disk_usage")
+def test_tmp_dir_not_enough_space(mock_disk_usage, temp_dir):
+    mock_disk_usage.return_value.free = 1024 ** 2
+
+    with pytest.warns(
+        UserWarning, match=re.escape("Not enough free space in {}".format(temp_dir))
+    ):
+        with MAGICC6(tmp_dir=temp_dir) as magicc:
+            assert dirname(magicc.root_dir) == gettempdir()
+
+    mock_disk_usage.assert_called_with(temp_dir)
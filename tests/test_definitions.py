@@ -1,8 +1,12 @@
 import re
+import subprocess
+import sys
 import warnings
 
+import pandas as pd
 import pytest
 
+import pymagicc.definitions
 from pymagicc.definitions import (
     convert_magicc6_to_magicc7_variables,
     convert_magicc7_to_openscm_variables,
@@ -432,3 +436,46 @@ def test_convert_openscm_to_magicc_regions(magicc7, openscm):
 )
 def test_convert_openscm_to_magicc_regions_one_way(magicc7, openscm):
     assert convert_magicc_to_openscm_regions(magicc7, inverse=False) == openscm
+
+
+def test_definitions_not_built_on_import():
+    code = (
+        "import sys, pymagicc, pymagicc.definitions as d\n"
+        "assert not any([n in vars(d) for n in d._DEFINITION_LOADERS])\n"
+        "assert 'pandas_datapackage_reader' not in sys.modules\n"
+        "assert pymagicc.MAGICCData\n"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.parametrize(
+    "name, expected_type",
+    [
+        ("DATTYPE_REGIONMODE_REGIONS", pd.DataFrame),
+        ("MAGICC7_EMISSIONS_UNITS", pd.DataFrame),
+        ("MAGICC7_CONCENTRATIONS_UNITS", pd.DataFrame),
+        ("PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0", list),
+        ("PART_OF_SCENFILE_WITH_EMISSIONS_CODE_1", list),
+        ("PART_OF_PRNFILE", list),
+        ("MAGICC7_TO_OPENSCM_VARIABLES_MAPPING", dict),
+        ("OPENSCM_TO_MAGICC7_VARIABLES_MAPPING", dict),
+    ],
+)
+def test_lazy_definitions(name, expected_type):
+    first = getattr(pymagicc.definitions, name)
+
+    assert isinstance(first, expected_type)
+    assert getattr(pymagicc.definitions, name) is first
+    assert name in dir(pymagicc.definitions)
+
+
+def test_lazy_definitions_values():
+    assert "CO2I" in pymagicc.definitions.PART_OF_SCENFILE_WITH_EMISSIONS_CODE_0
+    mapping = pymagicc.definitions.OPENSCM_TO_MAGICC7_VARIABLES_MAPPING
+    assert mapping["Surface Temperature"] == "SURFACE_TEMP"
+
+
+def test_definitions_missing_attribute():
+    with pytest.raises(AttributeError, match="has no attribute 'junk'"):
+        pymagicc.definitions.junk
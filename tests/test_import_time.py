@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+import pytest
+
+# worker processes (see pymagicc.parallel) import pymagicc afresh, hence import time
+# is paid by every worker. Compare timings with `pytest tests/test_import_time.py
+# --benchmark-compare` to catch regressions.
+
+
+def _import_in_new_interpreter(module):
+    subprocess.run([sys.executable, "-c", "import {}".format(module)], check=True)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("module", ["pymagicc", "pymagicc.io", "pymagicc.definitions"])
+def test_import_time(benchmark, module):
+    benchmark.pedantic(_import_in_new_interpreter, args=(module,), rounds=3)
+
+
+def test_import_does_not_check_for_wine():
+    code = (
+        "import pymagicc, pymagicc.config\n"
+        "assert pymagicc.config._wine_installed.cache_info().currsize == 0\n"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -2,9 +2,10 @@ import datetime as dt
 import filecmp
 import re
 import shutil
+import struct
 import warnings
 from copy import deepcopy
-from os import listdir
+from os import listdir, remove
 from os.path import basename, dirname, isfile, join
 from unittest.mock import patch
 
@@ -15,7 +16,7 @@ import pkg_resources
 import pytest
 from numpy import testing as npt
 from openscm_units import unit_registry
-from scmdata import ScmRun
+from scmdata import ScmRun, run_append
 from scmdata.testing import assert_scmdf_almost_equal
 
 import pymagicc.definitions
@@ -26,13 +27,16 @@ from pymagicc.io import (
     _ConcInReader,
     determine_tool,
     get_generic_rcp_name,
+    iter_compact_out,
     pull_cfg_from_parameters_out,
     pull_cfg_from_parameters_out_file,
     read_cfg_file,
+    read_compact_out,
     read_mag_file_metadata,
     to_int,
 )
 from pymagicc.io.base import _Reader
+from pymagicc.io.binout import _BinaryOutReader, _BinData
 from pymagicc.io.compact import find_parameter_groups
 from pymagicc.io.scen import get_special_scen_code
 
@@ -47,8 +51,6 @@ TEST_OUT_FILES = listdir(TEST_OUT_DIR)
 
 INVALID_OUT_FILES = [
     r"CARBONCYCLE.*OUT",
-    r".*SUBANN.*\.BINOUT",
-    r"DAT_VOLCANIC_RF\.BINOUT",
     r"PF.*OUT",
     r"DATBASKET_.*",
     r"PRECIPINPUT.*OUT",
@@ -3155,24 +3157,15 @@ def test_cant_read_all_invalid_files_in_magicc6_out_dir(file_to_read):
     if valid_filepath:
         return
 
-    if ("SUBANN" in file_to_read) or ("VOLCANIC_RF" in file_to_read):
-        error_msg = (
-            r"^.*"
-            + re.escape(": Only annual files can currently be processed")
-            + r".*$"
-        )
-        with pytest.raises(InvalidTemporalResError, match=error_msg):
-            MAGICCData(join(TEST_OUT_DIR, file_to_read))
-    else:
-        error_msg = (
-            r"^.*"
-            + re.escape(
-                "is in an odd format for which we will never provide a reader/writer"
-            )
-            + r".*$"
+    error_msg = (
+        r"^.*"
+        + re.escape(
+            "is in an odd format for which we will never provide a reader/writer"
         )
-        with pytest.raises(NoReaderWriterError, match=error_msg):
-            MAGICCData(join(TEST_OUT_DIR, file_to_read))
+        + r".*$"
+    )
+    with pytest.raises(NoReaderWriterError, match=error_msg):
+        MAGICCData(join(TEST_OUT_DIR, file_to_read))
 
 
 @pytest.mark.parametrize(
@@ -3180,11 +3173,7 @@ def test_cant_read_all_invalid_files_in_magicc6_out_dir(file_to_read):
     [f for f in listdir(TEST_OUT_DIR) if f.endswith("BINOUT") and f.startswith("DAT_")],
 )
 def test_bin_and_ascii_equal(file_to_read):
-    try:
-        mdata_bin = MAGICCData(join(TEST_OUT_DIR, file_to_read))
-    except InvalidTemporalResError:
-        # Some BINOUT files are on a subannual time scale and cannot be read (yet)
-        return
+    mdata_bin = MAGICCData(join(TEST_OUT_DIR, file_to_read))
 
     assert (mdata_bin["unit"] == "unknown").all()
     assert (mdata_bin["todo"] == "not_relevant").all()
@@ -3602,6 +3591,252 @@ def test_compact_binout_reader():
     )
 
 
+def test_compact_out_reader_unordered_columns(temp_dir):
+    filepath = join(temp_dir, "COMPACT.OUT")
+    with open(filepath, "w") as fh:
+        fh.write(
+            "DAT_SURFACE_TEMP__GLOBAL__1766,RF_REGIONS_CH4_2,"
+            "DAT_CO2_CONC__NH-OCEAN__1765,RF_REGIONS_CH4_1,"
+            "DAT_SURFACE_TEMP__GLOBAL__1765,DAT_CO2_CONC__NH-OCEAN__1766,\n"
+        )
+        fh.write("1.0,0.2,278.0,0.1,0.5,279.0,\n")
+        fh.write("2.0,0.4,280.0,0.3,1.5,281.0,\n")
+
+    mdata = MAGICCData(filepath)
+
+    assert mdata.filter(run_id=0)["rf_regions_ch4"].unique().tolist() == [(0.1, 0.2)]
+    assert mdata.filter(run_id=1)["rf_regions_ch4"].unique().tolist() == [(0.3, 0.4)]
+
+    assert_mdata_value(
+        mdata, 0.5, variable="Surface Temperature", region="World", year=1765, run_id=0
+    )
+    assert_mdata_value(
+        mdata, 2.0, variable="Surface Temperature", region="World", year=1766, run_id=1
+    )
+    assert_mdata_value(
+        mdata,
+        281.0,
+        variable="Atmospheric Concentrations|CO2",
+        region="World|Northern Hemisphere|Ocean",
+        year=1766,
+        run_id=1,
+    )
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "1.0,2.0,\n3.0,4.0,\n",
+        "1.0,2.0,3.0,\n3.0,4.0,5.0,6.0,\n",
+        "1.0,2.0,3.0,4.0,\n",
+        "1.0,2.0,3.0,\n3.0,4.0,\n",
+    ],
+)
+def test_compact_out_reader_wrong_number_of_values(temp_dir, body):
+    filepath = join(temp_dir, "COMPACT.OUT")
+    with open(filepath, "w") as fh:
+        fh.write('"CORE_CLIMATESENSITIVITY",DAT_CO2_CONC__GLOBAL__1765,')
+        fh.write("DAT_CO2_CONC__GLOBAL__1766,\n")
+        fh.write(body)
+
+    with pytest.raises(AssertionError, match="# headers does not match # lines"):
+        MAGICCData(filepath)
+
+
+def _read_compact_binout_bytes():
+    with open(join(TEST_DATA_DIR, "COMPACT.BINOUT"), "rb") as fh:
+        return fh.read()
+
+
+def test_compact_binout_reader_truncated(temp_dir):
+    filepath = join(temp_dir, "COMPACT.BINOUT")
+    with open(filepath, "wb") as fh:
+        fh.write(_read_compact_binout_bytes()[:-4])
+
+    with pytest.raises(AssertionError, match="# headers does not match # lines"):
+        MAGICCData(filepath)
+
+
+def test_compact_binout_reader_bad_line_end(temp_dir):
+    contents = _read_compact_binout_bytes()
+    # corrupt the terminator of the last line
+    contents = contents[:-7] + b"BAD" + contents[-4:]
+
+    filepath = join(temp_dir, "COMPACT.BINOUT")
+    with open(filepath, "wb") as fh:
+        fh.write(contents)
+
+    with pytest.raises(AssertionError, match="Unexpected final line value: b'BAD'"):
+        MAGICCData(filepath)
+
+
+def _sorted_timeseries(mdata):
+    ts = mdata.timeseries()
+    return ts.reorder_levels(sorted(ts.index.names)).sort_index()
+
+
+@pytest.mark.parametrize("filename", ["COMPACT.OUT", "COMPACT.BINOUT"])
+@pytest.mark.parametrize("runs_per_chunk", [1, 2, 5])
+def test_iter_compact_out(filename, runs_per_chunk):
+    filepath = join(TEST_DATA_DIR, filename)
+    chunks = list(iter_compact_out(filepath, runs_per_chunk=runs_per_chunk))
+
+    expected_run_ids = [[0], [1]] if runs_per_chunk == 1 else [[0, 1]]
+    assert [sorted(c["run_id"].unique().tolist()) for c in chunks] == expected_run_ids
+    assert all([c.filepath == filepath for c in chunks])
+
+    res = _sorted_timeseries(run_append(chunks))
+    pd.testing.assert_frame_equal(res, _sorted_timeseries(MAGICCData(filepath)))
+
+
+def _write_compact_out_header_only(filename, filepath):
+    source = join(TEST_DATA_DIR, filename)
+    if filename == "COMPACT.OUT":
+        with open(source) as fh:
+            contents = fh.readline()
+        with open(filepath, "w") as fh:
+            fh.write(contents)
+
+        return
+
+    with _BinData(source) as data:
+        # the header finishes with an END record
+        while not data.read_record().tobytes() == b"END":
+            pass
+
+        contents = data.data[: data.pos].tobytes()
+
+    with open(filepath, "wb") as fh:
+        fh.write(contents)
+
+
+@pytest.mark.parametrize("filename", ["COMPACT.OUT", "COMPACT.BINOUT"])
+def test_iter_compact_out_no_runs(temp_dir, filename):
+    filepath = join(temp_dir, filename)
+    _write_compact_out_header_only(filename, filepath)
+
+    assert list(iter_compact_out(filepath, runs_per_chunk=2)) == []
+    assert read_compact_out(filepath).empty
+
+
+def test_iter_compact_out_many_runs(temp_dir):
+    filepath = join(temp_dir, "COMPACT.OUT")
+    with open(filepath, "w") as fh:
+        fh.write("CORE_CLIMATESENSITIVITY,DAT_SURFACE_TEMP__GLOBAL__1765,\n")
+        for i in range(5):
+            fh.write("{0}.0,{0}.5,\n".format(i))
+
+    chunks = list(iter_compact_out(filepath, runs_per_chunk=2))
+
+    assert [c["run_id"].tolist() for c in chunks] == [[0, 1], [2, 3], [4]]
+    for chunk in chunks:
+        for run_id, ecs in zip(chunk["run_id"], chunk["core_climatesensitivity"]):
+            assert ecs == run_id
+            assert_mdata_value(chunk, run_id + 0.5, run_id=run_id)
+
+
+def test_iter_compact_out_bad_line(temp_dir):
+    filepath = join(temp_dir, "COMPACT.OUT")
+    with open(filepath, "w") as fh:
+        fh.write("CORE_CLIMATESENSITIVITY,DAT_SURFACE_TEMP__GLOBAL__1765,\n")
+        fh.write("3.0,0.5,\n")
+        fh.write("3.0,0.5,1.0,2.0,\n")
+
+    chunks = iter_compact_out(filepath, runs_per_chunk=1)
+    with pytest.raises(AssertionError, match="# headers does not match # lines"):
+        list(chunks)
+
+
+def test_iter_compact_out_invalid():
+    with pytest.raises(ValueError, match="runs_per_chunk must be at least 1"):
+        iter_compact_out(join(TEST_DATA_DIR, "COMPACT.OUT"), runs_per_chunk=0)
+
+    filepath = join(MAGICC6_DIR, "HISTRCP_CO2I_EMIS.IN")
+    with pytest.raises(ValueError, match="is not a compact output file"):
+        iter_compact_out(filepath)
+
+
+@pytest.mark.parametrize("filename", ["COMPACT.OUT", "COMPACT.BINOUT"])
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"regions": "World"},
+        {"regions": ["World", "World|Northern Hemisphere|Ocean"]},
+        {"regions": "World|*|Ocean", "years": range(1980, 2001)},
+        {"variables": "Atmospheric Concentrations|CO2", "years": 1990},
+        {"variables": "Surface Temperature"},
+    ],
+)
+def test_read_compact_out(filename, filters):
+    filepath = join(TEST_DATA_DIR, filename)
+    res = read_compact_out(filepath, **filters)
+
+    expected = MAGICCData(filepath)
+    filter_kwargs = {
+        "variable": filters.get("variables", "*"),
+        "region": filters.get("regions", "*"),
+    }
+    if "years" in filters:
+        filter_kwargs["year"] = list(np.atleast_1d(filters["years"]))
+    expected = expected.filter(**filter_kwargs)
+
+    assert res.filepath == filepath
+    if expected.empty:
+        assert res.empty
+    else:
+        # years which aren't in the file for any selected timeseries aren't read
+        expected_ts = _sorted_timeseries(expected).dropna(axis=1, how="all")
+        pd.testing.assert_frame_equal(_sorted_timeseries(res), expected_ts)
+
+
+@pytest.mark.parametrize("filename", ["COMPACT.OUT", "COMPACT.BINOUT"])
+def test_iter_compact_out_filters(filename):
+    filepath = join(TEST_DATA_DIR, filename)
+    chunks = list(
+        iter_compact_out(filepath, runs_per_chunk=1, regions="World", years=[1765])
+    )
+
+    assert [c["run_id"].tolist() for c in chunks] == [[0], [1]]
+    for chunk in chunks:
+        assert chunk["region"].tolist() == ["World"]
+        assert chunk["year"].tolist() == [1765]
+        assert chunk["core_climatesensitivity"].tolist() in [[2.5], [3.0]]
+        assert_mdata_value(chunk, 277.9355)
+
+
+def test_read_compact_out_invalid():
+    filepath = join(MAGICC6_DIR, "HISTRCP_CO2I_EMIS.IN")
+    with pytest.raises(ValueError, match="is not a compact output file"):
+        read_compact_out(filepath, regions="World")
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "1.0,2.0,3.0,\n3.0,4.0,5.0,6.0,7.0,\n",
+        "1.0,2.0,3.0,\n3.0,4.0,\n",
+    ],
+)
+def test_read_compact_out_filtered_wrong_number_of_values(temp_dir, body):
+    filepath = join(temp_dir, "COMPACT.OUT")
+    with open(filepath, "w") as fh:
+        fh.write('"CORE_CLIMATESENSITIVITY",DAT_CO2_CONC__GLOBAL__1765,')
+        fh.write("DAT_CO2_CONC__GLOBAL__1766,\n")
+        fh.write(body)
+
+    with pytest.raises(AssertionError, match="# headers does not match # lines"):
+        read_compact_out(filepath, years=1766)
+
+
+def test_read_compact_out_filtered_truncated(temp_dir):
+    filepath = join(temp_dir, "COMPACT.BINOUT")
+    with open(filepath, "wb") as fh:
+        fh.write(_read_compact_binout_bytes()[:-4])
+
+    with pytest.raises(AssertionError, match="# headers does not match # lines"):
+        read_compact_out(filepath, regions="World", years=1765)
+
+
 def test_compact_out_writer():
     test_name = "TEST_COMPACT.OUT"
 
@@ -4343,6 +4578,120 @@ def test_binary_reader_global_only(inp_file):
     assert res.get_unique_meta("region", no_duplicates=True) == "World"
 
 
+def test_bin_data_read_chunk_views():
+    with _BinData(join(TEST_DATA_DIR, "bin_v2", "DAT_SURFACE_TEMP.BINOUT")) as data:
+        assert b"".join(data.read_chunk("c").tolist()) == b"magicc"
+        assert data.read_chunk("h") == 2
+
+        for _ in range(4):
+            data.read_chunk("I")
+
+        data.read_chunk("c")  # variable
+        data.read_chunk("c")  # region
+        data.read_chunk("c")  # unit
+        values = data.read_chunk("d")
+
+        # no copy of the file's contents is made
+        assert not values.flags.owndata
+        assert not values.flags.writeable
+        del values
+
+
+def test_bin_data_empty_file(temp_dir):
+    filepath = join(temp_dir, "DAT_EMPTY.BINOUT")
+    open(filepath, "wb").close()
+
+    with _BinData(filepath) as data:
+        assert len(data.data) == 0
+
+
+@pytest.mark.parametrize("bin_format", ["bin_legacy", "bin_v2"])
+def test_binary_reader_releases_file(temp_dir, bin_format):
+    filepath = join(temp_dir, "DAT_SURFACE_TEMP.BINOUT")
+    shutil.copy(join(TEST_DATA_DIR, bin_format, "DAT_SURFACE_TEMP.BINOUT"), filepath)
+
+    res = MAGICCData(filepath)
+
+    # the output must not be backed by the file (on Windows, a file which is mapped
+    # into memory can't be removed)
+    data = res.timeseries().values
+    remove(filepath)
+    npt.assert_allclose(res.timeseries().values, data)
+
+
+def _write_v2_binout(filepath, columns, data, firstyear, annualsteps=1):
+    def record(payload):
+        return struct.pack("i", len(payload)) + payload + struct.pack("i", len(payload))
+
+    out = record(b"magicc") + record(struct.pack("h", 2))
+    lastyear = firstyear + data.shape[0] // annualsteps - 1
+    for v in [len(columns), firstyear, lastyear, annualsteps]:
+        out += record(struct.pack("I", v))
+
+    for (variable, region, unit), values in zip(columns, data.T):
+        for header in [variable, region, unit]:
+            out += record(header.encode())
+        out += record(values.astype(np.float64).tobytes())
+
+    with open(filepath, "wb") as fh:
+        fh.write(out)
+
+
+def test_binary_reader_v2_many_columns(temp_dir):
+    columns = [
+        ("DAT_SURFACE_TEMP", "GLOBAL", "K"),
+        ("DAT_CO2_CONC", "NHLAND", "ppm"),
+        ("DAT_CH4_CONC", "SHOCEAN", "ppb"),
+    ] * 50
+    data = np.arange(10 * len(columns), dtype=float).reshape(10, len(columns))
+    filepath = join(temp_dir, "DAT_MANY.BINOUT")
+    _write_v2_binout(filepath, columns, data, 2000)
+
+    res = _BinaryOutReader(filepath).read()
+
+    _, df, res_columns = res
+    npt.assert_array_equal(df.values, data)
+    npt.assert_array_equal(df.index, np.arange(2000, 2010))
+    assert res_columns["variable"][:3] == [
+        "Surface Temperature",
+        "Atmospheric Concentrations|CO2",
+        "Atmospheric Concentrations|CH4",
+    ]
+    assert res_columns["region"][:3] == [
+        "World",
+        "World|Northern Hemisphere|Land",
+        "World|Southern Hemisphere|Ocean",
+    ]
+    assert res_columns["unit"] == ["K", "ppm", "ppb"] * 50
+
+
+def test_binary_reader_v2_monthly(temp_dir):
+    columns = [("DAT_SURFACE_TEMP_SUBANNUAL", "GLOBAL", "K")]
+    data = np.arange(24, dtype=float).reshape(24, 1)
+    filepath = join(temp_dir, "DAT_SURFACE_TEMP_SUBANNUAL.BINOUT")
+    _write_v2_binout(filepath, columns, data, 2000, annualsteps=12)
+
+    res = MAGICCData(filepath)
+
+    assert res.get_unique_meta("variable", True) == "Surface Temperature"
+    assert res.get_unique_meta("unit", True) == "K"
+    npt.assert_array_equal(res.values.squeeze(), data.squeeze())
+    times = res.timeseries().columns
+    assert times[0] == dt.datetime(2000, 1, 1)
+    assert times[12] == dt.datetime(2001, 1, 1)
+    assert [t.year for t in times] == [2000] * 12 + [2001] * 12
+
+
+def test_binary_reader_invalid_annualsteps(temp_dir):
+    columns = [("DAT_SURFACE_TEMP", "GLOBAL", "K")]
+    filepath = join(temp_dir, "DAT_SURFACE_TEMP.BINOUT")
+    _write_v2_binout(filepath, columns, np.zeros((8, 1)), 2000, annualsteps=4)
+
+    error_msg = re.escape("Only annual and monthly files can currently be processed")
+    with pytest.raises(InvalidTemporalResError, match=error_msg):
+        MAGICCData(filepath)
+
+
 def test_binary_reader_different_versions():
     res_legacy = MAGICCData(
         join(TEST_DATA_DIR, "bin_legacy", "DAT_SURFACE_TEMP.BINOUT")
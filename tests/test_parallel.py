@@ -0,0 +1,258 @@
+import gc
+import pickle
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from os.path import exists
+from subprocess import TimeoutExpired
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pymagicc import MAGICCJob, iter_runs, rcp26, rcps, run_ensemble
+from pymagicc.core import _empty_run_output
+from pymagicc.parallel import (
+    _ensemble_jobs,
+    _get_worker_magicc,
+    _run_job,
+    _split_scenarios,
+    _tag_result,
+)
+
+
+def _fake_run_job(magicc_version, strict, only, timeout, job):
+    scenario, config = job
+    if scenario == "fail":
+        raise ValueError("run failed")
+
+    return scenario * config.get("factor", 1)
+
+
+def _fake_run_job_with_timeouts(magicc_version, strict, only, timeout, job):
+    scenario, _ = job
+    if scenario == "slow":
+        res = _empty_run_output()
+        res.metadata["error"] = "timed out after {} seconds".format(timeout)
+        return res
+
+    return rcp26.filter(variable="Emissions|CO2|MAGICC Fossil and Industrial")
+
+
+def test_split_scenarios():
+    res = _split_scenarios(rcps)
+
+    assert len(res) == 4
+    assert sorted([r.get_unique_meta("scenario", True) for r in res]) == [
+        "RCP26",
+        "RCP45",
+        "RCP60",
+        "RCP85",
+    ]
+
+
+def test_split_scenarios_none():
+    assert _split_scenarios(None) == [None]
+
+
+def test_ensemble_jobs():
+    configs = [{"core_climatesensitivity": 2}, {"core_climatesensitivity": 3}]
+    res = _ensemble_jobs(["a", "b"], configs)
+
+    assert res == [
+        ("a", configs[0]),
+        ("a", configs[1]),
+        ("b", configs[0]),
+        ("b", configs[1]),
+    ]
+
+
+def test_ensemble_jobs_no_configs():
+    assert _ensemble_jobs(["a", "b"], None) == [("a", {}), ("b", {})]
+
+
+def test_tag_result():
+    res = _tag_result(
+        rcp26.copy(),
+        3,
+        {"core_climatesensitivity": 2.5, "out_zero_temp_period": [1990, 2000]},
+    )
+
+    assert (res["run_id"] == 3).all()
+    assert (res["core_climatesensitivity"] == 2.5).all()
+    assert res.get_unique_meta("out_zero_temp_period", True) == (1990, 2000)
+
+
+def test_magicc_job_pickle():
+    job = MAGICCJob(rcp26, {"core_climatesensitivity": 3}, only=["Surface Temperature"])
+
+    res = pickle.loads(pickle.dumps(job))
+
+    pd.testing.assert_frame_equal(res.scenario.timeseries(), rcp26.timeseries())
+    assert res.config == {"core_climatesensitivity": 3}
+    assert res.only == ["Surface Temperature"]
+    assert res.magicc_version == 6
+    assert res.strict
+    assert res.timeout is None
+
+
+def test_magicc_job_invalid_version():
+    error_msg = re.escape("MAGICC version 5 is not available")
+    with pytest.raises(ValueError, match=error_msg):
+        MAGICCJob(rcp26, magicc_version=5)
+
+
+@patch("pymagicc.parallel._run_job", _fake_run_job)
+def test_magicc_job_submit():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = MAGICCJob(3, {"factor": 2}, timeout=5).submit(executor)
+
+        assert future.result() == 6
+
+
+def test_get_worker_magicc_per_thread():
+    def get_root_dirs():
+        return (
+            threading.get_ident(),
+            _get_worker_magicc(6, True).root_dir,
+            _get_worker_magicc(6, True).root_dir,
+        )
+
+    barrier = threading.Barrier(2)
+
+    def get_root_dirs_together():
+        # make sure each thread in the pool is used
+        barrier.wait()
+        return get_root_dirs()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        res = list(executor.map(lambda _: get_root_dirs_together(), range(2)))
+
+    assert res[0][0] != res[1][0]
+    # each thread re-uses its own copy
+    assert res[0][1] == res[0][2]
+    assert res[1][1] == res[1][2]
+    assert res[0][1] != res[1][1]
+
+    # the copies are removed once their threads have exited
+    gc.collect()
+    assert not exists(res[0][1])
+    assert not exists(res[1][1])
+
+
+@patch("pymagicc.parallel._run_job", _fake_run_job)
+def test_iter_runs():
+    jobs = [(i, {"factor": 2}) for i in range(6)]
+
+    res = list(iter_runs(jobs, n_workers=2))
+
+    assert sorted(res) == [(job, job[0] * 2) for job in jobs]
+    # the jobs themselves are yielded, not copies
+    assert all([any([job is j for j in jobs]) for job, _ in res])
+
+
+@patch("pymagicc.parallel._run_job", _fake_run_job)
+def test_iter_runs_max_in_flight():
+    consumed = []
+
+    def jobs():
+        for i in range(10):
+            consumed.append(i)
+            yield i, {}
+
+    runs = iter_runs(jobs(), n_workers=2, max_in_flight=3)
+
+    # a new job is only started once the caller is done with a result
+    next(runs)
+    assert len(consumed) == 3
+
+    next(runs)
+    assert len(consumed) == 4
+
+    runs.close()
+    assert len(consumed) == 4
+
+
+@patch("pymagicc.parallel._run_job", _fake_run_job)
+def test_iter_runs_executor():
+    jobs = [(i, {"factor": 3}) for i in range(4)]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        res = list(iter_runs(jobs, executor=executor))
+
+        # the executor is left for the caller to shut down
+        assert executor.submit(lambda: 1).result() == 1
+
+    assert sorted(res) == [(job, job[0] * 3) for job in jobs]
+
+
+@patch("pymagicc.parallel._run_job", _fake_run_job)
+def test_iter_runs_failure():
+    with pytest.raises(ValueError, match="run failed"):
+        list(iter_runs([(1, {}), ("fail", {})], n_workers=1))
+
+
+@patch("pymagicc.parallel._get_worker_magicc")
+def test_run_job_timeout(mock_get_worker_magicc):
+    mock_magicc = MagicMock()
+    mock_magicc.run.side_effect = TimeoutExpired(["magicc"], 2)
+    mock_get_worker_magicc.return_value = mock_magicc
+
+    res = _run_job(6, True, None, 2, ("scen", {"core_climatesensitivity": 3}))
+
+    assert len(res) == 0
+    assert "timed out after 2 seconds" in res.metadata["error"]
+    mock_magicc.run.assert_called_once_with(
+        scenario="scen", only=None, timeout=2, core_climatesensitivity=3
+    )
+
+
+@patch("pymagicc.parallel._run_job", _fake_run_job_with_timeouts)
+def test_run_ensemble_timeout():
+    res = run_ensemble(["ok", "slow", "ok"], n_workers=2, timeout=3)
+
+    assert sorted(res["run_id"].unique().tolist()) == [0, 2]
+    assert res.metadata["failures"] == {1: "timed out after 3 seconds"}
+
+
+@patch("pymagicc.parallel._run_job", _fake_run_job_with_timeouts)
+def test_run_ensemble_all_timeout():
+    res = run_ensemble(["slow"], n_workers=1, timeout=3)
+
+    assert len(res) == 0
+    assert res.metadata["failures"] == {0: "timed out after 3 seconds"}
+
+
+def test_run_ensemble_no_scenarios():
+    res = run_ensemble([], n_workers=2)
+
+    assert len(res) == 0
+    assert res.metadata["failures"] == {}
+
+
+def test_run_ensemble_invalid_version():
+    error_msg = re.escape("MAGICC version 5 is not available")
+    with pytest.raises(ValueError, match=error_msg):
+        run_ensemble(rcp26, magicc_version=5)
+
+
+@pytest.mark.slow
+def test_run_ensemble(package):
+    configs = [{"core_climatesensitivity": 2}, {"core_climatesensitivity": 4}]
+    res = run_ensemble(
+        rcps.filter(scenario=["RCP26", "RCP85"]),
+        configs,
+        magicc_version=package.version,
+        n_workers=2,
+        only=["Surface Temperature"],
+    )
+
+    assert sorted(res["run_id"].unique().tolist()) == [0, 1, 2, 3]
+    assert sorted(res["core_climatesensitivity"].unique().tolist()) == [2, 4]
+
+    temp_2100 = res.filter(region="World", year=2100)
+    for scenario in ["RCP26", "RCP85"]:
+        low = temp_2100.filter(scenario=scenario, core_climatesensitivity=2)
+        high = temp_2100.filter(scenario=scenario, core_climatesensitivity=4)
+        assert np.all(high.values > low.values)
@@ -0,0 +1,118 @@
+from os import listdir
+from os.path import exists, join
+from unittest.mock import patch
+
+import f90nml
+import pytest
+
+import pymagicc
+from pymagicc import MAGICC6, rcp26
+from pymagicc.pool import MAGICCPool, close_pools, get_pool
+
+
+@pytest.fixture
+def magicc6():
+    magicc = MAGICC6()
+    magicc.create_copy()
+    yield magicc
+
+    magicc.remove_temp_copy()
+
+
+@pytest.fixture
+def pool():
+    pool = MAGICCPool(6, size=2)
+    yield pool
+
+    pool.close()
+
+
+def test_reset_to_pristine_state(magicc6):
+    magicc6._record_pristine_state()
+    tune_file = join(magicc6.run_dir, "MAGTUNE_PYMAGICC.CFG")
+    expected_tune = f90nml.read(tune_file)
+
+    magicc6.set_config(core_climatesensitivity=5)
+    magicc6.set_years(startyear=1800)
+    magicc6.write(rcp26, magicc6._scen_file_name)
+    with open(join(magicc6.run_dir, "HISTRCP_CO2I_EMIS.IN"), "w") as fh:
+        fh.write("junk")
+    with open(join(magicc6.out_dir, "DAT_SURFACE_TEMP.OUT"), "w") as fh:
+        fh.write("junk")
+    magicc6.config = {"junk": 1}
+
+    magicc6._reset_to_pristine_state()
+
+    assert f90nml.read(tune_file) == expected_tune
+    years = f90nml.read(join(magicc6.run_dir, "MAGCFG_NMLYEARS.CFG"))
+    assert years["nml_years"]["startyear"] == 1765
+    assert not exists(join(magicc6.run_dir, magicc6._scen_file_name))
+    with open(join(magicc6.run_dir, "HISTRCP_CO2I_EMIS.IN")) as fh:
+        assert fh.read() != "junk"
+    assert listdir(magicc6.out_dir) == []
+    assert magicc6.config is None
+
+
+def test_pool_reuses_instances(pool):
+    first = pool.acquire()
+    root_dir = first.root_dir
+    first.set_config(core_climatesensitivity=5)
+    pool.release(first)
+
+    # wait for the background reset and refill
+    pool._background.submit(lambda: None).result()
+
+    assert len(pool._ready) == 2
+    root_dirs = [m.root_dir for m in pool._ready]
+    assert root_dir in root_dirs
+
+    with pool.magicc():
+        pass
+
+    pool._background.submit(lambda: None).result()
+    assert sorted([m.root_dir for m in pool._ready]) == sorted(root_dirs)
+
+    with pool.magicc() as magicc:
+        assert exists(magicc.run_dir)
+        cfg = f90nml.read(join(magicc.run_dir, "MAGTUNE_PYMAGICC.CFG"))
+        assert "core_climatesensitivity" not in cfg["nml_allcfgs"]
+
+
+def test_pool_close(pool):
+    with pool.magicc():
+        pass
+
+    pool._background.submit(lambda: None).result()
+    root_dirs = [m.root_dir for m in pool._ready]
+    assert all([exists(d) for d in root_dirs])
+
+    pool.close()
+
+    assert not any([exists(d) for d in root_dirs])
+    with pytest.raises(ValueError, match="Pool has been closed"):
+        pool.acquire()
+
+
+def test_get_pool():
+    try:
+        pool = get_pool(6, size=1)
+        assert get_pool(6, size=1) is pool
+        assert pool.size == 1
+    finally:
+        close_pools()
+
+
+@patch.object(MAGICC6, "run")
+def test_run_uses_pool(mock_run, config_override):
+    config_override("POOL_SIZE", 1)
+    mock_run.return_value = "mocked"
+
+    try:
+        assert pymagicc.run(rcp26) == "mocked"
+        pool = get_pool(6)
+        pool._background.submit(lambda: None).result()
+        assert len(pool._ready) == 1
+    finally:
+        close_pools()
+
+    mock_run.assert_called_once_with(scenario=rcp26)
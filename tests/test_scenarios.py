@@ -1,5 +1,48 @@
+import subprocess
+import sys
+
+import pytest
+
+import pymagicc
+import pymagicc.scenarios
 from pymagicc.scenarios import rcps
 
 
 def test_all_rcps_included():
     assert set(rcps["scenario"]) == {"RCP26", "RCP45", "RCP60", "RCP85"}
+
+
+def test_scenarios_not_loaded_on_import():
+    code = (
+        "import pymagicc, pymagicc.scenarios as s\n"
+        "assert not any([n in vars(s) for n in s._SCENARIO_LOADERS])\n"
+        "assert len(pymagicc.rcp45) > 0\n"
+        "assert 'rcp45' in vars(s)\n"
+        "assert 'rcp26' not in vars(s)\n"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.parametrize("name", ["rcp26", "rcps", "zero_emissions"])
+def test_scenarios_cached(monkeypatch, name):
+    # start with nothing loaded so that rcp26 is loaded before the other scenarios
+    for loaded in pymagicc.scenarios._SCENARIO_LOADERS:
+        monkeypatch.delitem(vars(pymagicc.scenarios), loaded, raising=False)
+
+    rcp26 = pymagicc.scenarios.rcp26
+    first = getattr(pymagicc.scenarios, name)
+
+    assert getattr(pymagicc.scenarios, name) is first
+    assert getattr(pymagicc, name) is first
+    assert pymagicc.scenarios.rcp26 is rcp26
+
+
+def test_scenarios_dir():
+    assert "zero_emissions" in dir(pymagicc.scenarios)
+
+
+@pytest.mark.parametrize("module", [pymagicc, pymagicc.scenarios])
+def test_missing_attribute(module):
+    with pytest.raises(AttributeError, match="has no attribute 'junk'"):
+        module.junk